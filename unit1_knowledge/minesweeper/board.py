@@ -0,0 +1,145 @@
+import random
+
+import numpy as np
+
+
+class BitboardMinesweeper():
+    """
+    Minesweeper game representation backed by NumPy arrays.
+
+    Drop-in replacement for `Minesweeper`: mines are stored as a packed
+    bit array, and the number of nearby mines for every cell is computed
+    once at construction, so `is_mine`, `nearby_mines` and `won` are O(1).
+    """
+
+    def __init__(self, height=8, width=8, mines=8):
+
+        # Set initial width, height, and number of mines
+        self.height = height
+        self.width = width
+        self.mine_count = mines
+
+        # Add mines randomly, seeded from `random` so that
+        # seeding the module still makes games reproducible
+        rng = np.random.default_rng(random.getrandbits(64))
+        positions = rng.choice(height * width, size=mines, replace=False)
+        field = np.zeros(height * width, dtype=bool)
+        field[positions] = True
+        field = field.reshape(height, width)
+
+        # Store mines as one bit per cell, rows padded to whole bytes
+        self.bits = np.packbits(field, axis=1)
+
+        # Count nearby mines for every cell at once
+        self.counts = neighbor_counts(field)
+
+        # At first, player has found no mines; flags are kept private so
+        # that the count of correct ones always matches them
+        self._flags = set()
+        self._correct = 0
+
+        self._mines = None
+
+    @property
+    def mines_found(self):
+        """
+        Cells flagged as mines, read-only: flag cells with `flag` and
+        `unflag`, or assign a whole new set of cells.
+        """
+        return frozenset(self._flags)
+
+    @mines_found.setter
+    def mines_found(self, cells):
+        self._flags = set(cells)
+        self._correct = sum(self.is_mine(cell) for cell in self._flags)
+
+    @property
+    def mines(self):
+        """
+        Set of all mine cells, built on first use.
+        """
+        if self._mines is None:
+            field = np.unpackbits(self.bits, axis=1, count=self.width)
+            self._mines = set(
+                (int(i), int(j)) for i, j in zip(*np.nonzero(field))
+            )
+        return self._mines
+
+    def print(self):
+        """
+        Prints a text-based representation
+        of where mines are located.
+        """
+        field = np.unpackbits(self.bits, axis=1, count=self.width)
+        for i in range(self.height):
+            print("--" * self.width + "-")
+            for j in range(self.width):
+                if field[i, j]:
+                    print("|X", end="")
+                else:
+                    print("| ", end="")
+            print("|")
+        print("--" * self.width + "-")
+
+    def is_mine(self, cell):
+        i, j = cell
+        return bool(self.bits[i, j >> 3] >> (7 - (j & 7)) & 1)
+
+    def nearby_mines(self, cell):
+        """
+        Returns the number of mines that are
+        within one row and column of a given cell,
+        not including the cell itself.
+        """
+        i, j = cell
+        return int(self.counts[i, j])
+
+    def flag(self, cell):
+        """
+        Marks a cell as a found mine.
+        """
+        if cell in self._flags:
+            return
+        self._flags.add(cell)
+        if self.is_mine(cell):
+            self._correct += 1
+
+    def unflag(self, cell):
+        """
+        Removes a cell from the found mines.
+        """
+        if cell not in self._flags:
+            return
+        self._flags.remove(cell)
+        if self.is_mine(cell):
+            self._correct -= 1
+
+    def won(self):
+        """
+        Checks if all mines have been flagged.
+        """
+        return (
+            self._correct == self.mine_count
+            and len(self._flags) == self.mine_count
+        )
+
+
+def neighbor_counts(field):
+    """
+    Return an array with the number of mines around each cell of the
+    boolean array `field`, not including the cell itself.
+
+    Equivalent to a 2D convolution of `field` with a 3x3 kernel of ones
+    and a zero centre, computed as a sum of shifted views.
+    """
+    height, width = field.shape
+    padded = np.zeros((height + 2, width + 2), dtype=np.uint8)
+    padded[1:-1, 1:-1] = field
+
+    counts = np.zeros((height, width), dtype=np.uint8)
+    for di in range(3):
+        for dj in range(3):
+            if di == 1 and dj == 1:
+                continue
+            counts += padded[di:di + height, dj:dj + width]
+    return counts
@@ -0,0 +1,217 @@
+import contextlib
+import io
+import random
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+
+from minesweeper import Minesweeper, MinesweeperAI
+
+# Board configurations as (height, width, mines)
+CONFIGS = [
+    (8, 8, 8),
+    (9, 9, 10),
+    (16, 16, 40),
+    (16, 30, 99)
+]
+GAMES = 1000
+SEED = 0
+
+# Board implementations, the bitboard one needs NumPy
+BOARDS = ["list", "bitboard"]
+
+
+def main():
+    if len(sys.argv) > 4 or (len(sys.argv) > 3 and sys.argv[3] not in BOARDS):
+        sys.exit("Usage: python simulate.py [games] [seed] [list|bitboard]")
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else GAMES
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else SEED
+    board = sys.argv[3] if len(sys.argv) > 3 else BOARDS[0]
+
+    for height, width, mines in CONFIGS:
+        results = simulate(height, width, mines, games, seed, board=board)
+        stats = summarize(results)
+        print(f"Board {height}x{width}, {mines} mines (n = {games})")
+        print_stats(stats)
+
+
+class Knowledge(list):
+    """
+    Knowledge base list that remembers its largest number of sentences
+    and of cells across all sentences.
+
+    The AI clears its knowledge base during every inference pass, so its
+    size after `add_knowledge` returns says nothing. Sentences and their
+    cells only ever grow through `append`, so the peaks are taken there.
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.high = 0
+        self.cells_high = 0
+
+    def append(self, sentence):
+        super().append(sentence)
+        self.high = max(self.high, len(self))
+        self.cells_high = max(
+            self.cells_high, sum(len(sentence.cells) for sentence in self)
+        )
+
+
+def new_game(height, width, mines, board="list"):
+    """
+    Return a new game using the board implementation named `board`.
+    """
+    if board == "bitboard":
+        from board import BitboardMinesweeper
+        return BitboardMinesweeper(height=height, width=width, mines=mines)
+    return Minesweeper(height=height, width=width, mines=mines)
+
+
+def play_game(height, width, mines, seed, board="list"):
+    """
+    Play a single game of Minesweeper with the AI, without a display.
+
+    The game and the AI share the module-level `random` generator,
+    so seeding it with `seed` makes the whole game reproducible.
+
+    Return a dictionary describing the outcome of the game:
+        - "won": whether the AI flagged exactly the board's mines
+        - "moves": number of moves made
+        - "kb_high": largest number of sentences in the knowledge base
+        - "kb_cells_high": largest number of cells across all sentences
+        - "latencies": seconds spent choosing and learning from each move
+    """
+    random.seed(seed)
+    game = new_game(height, width, mines, board)
+    ai = MinesweeperAI(height=height, width=width)
+    ai.knowledge = Knowledge(ai.knowledge)
+
+    result = {
+        "won": False,
+        "moves": 0,
+        "kb_high": 0,
+        "kb_cells_high": 0,
+        "latencies": []
+    }
+
+    # The AI reports every inference it makes, silence it
+    with contextlib.redirect_stdout(io.StringIO()):
+        while True:
+            start = time.perf_counter()
+            move = ai.make_safe_move()
+            if move is None:
+                move = ai.make_random_move()
+
+            # No moves left, the AI flags every mine it knows about
+            if move is None:
+                result["latencies"].append(time.perf_counter() - start)
+                result["won"] = ai.mines == game.mines
+                break
+
+            # Stepped on a mine
+            if game.is_mine(move):
+                result["latencies"].append(time.perf_counter() - start)
+                result["moves"] += 1
+                break
+
+            ai.add_knowledge(move, game.nearby_mines(move))
+            result["latencies"].append(time.perf_counter() - start)
+            result["moves"] += 1
+
+    # Knowledge base size high-water mark, including mid-inference
+    result["kb_high"] = ai.knowledge.high
+    result["kb_cells_high"] = ai.knowledge.cells_high
+    return result
+
+
+def _play_game(args):
+    """
+    Unpack arguments for `play_game` so it can be used with `map`.
+    """
+    return play_game(*args)
+
+
+def simulate(height, width, mines, games, seed=SEED, workers=None,
+             board="list"):
+    """
+    Play `games` games on a `height` x `width` board with `mines` mines,
+    spread across a pool of `workers` processes (default: one per CPU).
+    `board` names the board implementation, see `new_game`.
+
+    Game `k` is seeded with `seed + k`, so results do not depend
+    on how games are scheduled across processes.
+
+    Return a list of results from `play_game`, in game order.
+    """
+    tasks = [
+        (height, width, mines, seed + k, board) for k in range(games)
+    ]
+    chunksize = max(1, games // 64)
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(_play_game, tasks, chunksize=chunksize))
+    elapsed = time.perf_counter() - start
+
+    for result in results:
+        result["elapsed"] = elapsed / games
+    return results
+
+
+def percentile(values, p):
+    """
+    Return the `p`-th percentile (0 <= p <= 100) of `values`,
+    using the nearest-rank method.
+    """
+    if not values:
+        return 0
+    values = sorted(values)
+    rank = max(1, -(-p * len(values) // 100))
+    return values[int(rank) - 1]
+
+
+def summarize(results):
+    """
+    Aggregate a list of `play_game` results into a dictionary of
+    win rate, throughput, knowledge base size and latency statistics.
+    """
+    games = len(results)
+    moves = sum(result["moves"] for result in results)
+    elapsed = sum(result.get("elapsed", 0) for result in results)
+    latencies = [
+        latency for result in results for latency in result["latencies"]
+    ]
+
+    return {
+        "games": games,
+        "win_rate": sum(result["won"] for result in results) / games,
+        "moves": moves,
+        "moves_per_second": moves / elapsed if elapsed else 0,
+        "kb_high": max(result["kb_high"] for result in results),
+        "kb_cells_high": max(result["kb_cells_high"] for result in results),
+        "latency_p50": percentile(latencies, 50),
+        "latency_p90": percentile(latencies, 90),
+        "latency_p99": percentile(latencies, 99),
+        "latency_max": max(latencies) if latencies else 0
+    }
+
+
+def print_stats(stats):
+    """
+    Print statistics returned by `summarize`.
+    """
+    print(f"  win rate: {stats['win_rate']:.2%}")
+    print(f"  moves: {stats['moves']} ({stats['moves_per_second']:.0f}/s)")
+    print(f"  KB high-water mark: {stats['kb_high']} sentences, "
+          f"{stats['kb_cells_high']} cells")
+    print("  move latency: "
+          f"p50 {stats['latency_p50'] * 1e6:.0f}us, "
+          f"p90 {stats['latency_p90'] * 1e6:.0f}us, "
+          f"p99 {stats['latency_p99'] * 1e6:.0f}us, "
+          f"max {stats['latency_max'] * 1e6:.0f}us")
+
+
+if __name__ == "__main__":
+    main()
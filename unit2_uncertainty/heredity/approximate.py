@@ -0,0 +1,333 @@
+import sys
+import warnings
+
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor
+
+from exact import GENES, gene_table, trait_table
+from heredity import PROBS, load_data, print_probabilities
+
+SAMPLES = 100000
+
+# Independent batches used to estimate standard errors
+BATCHES = 10
+
+# Effective sample size of a likelihood weighting batch below which its
+# weights have collapsed onto too few samples to trust standard errors
+MIN_EFFECTIVE = 100
+
+# Gibbs sampling: chains run together per batch, and sweeps discarded
+CHAINS = 100
+BURN_IN = 100
+
+
+def main():
+
+    # Check for proper usage
+    methods = ["likelihood", "gibbs"]
+    if len(sys.argv) not in [2, 3, 4] or (
+            len(sys.argv) > 2 and sys.argv[2] not in methods):
+        sys.exit("Usage: python approximate.py data.csv "
+                 "[likelihood|gibbs] [samples]")
+    people = load_data(sys.argv[1])
+    method = sys.argv[2] if len(sys.argv) > 2 else "likelihood"
+    samples = int(sys.argv[3]) if len(sys.argv) > 3 else SAMPLES
+
+    effective = None
+    if method == "likelihood":
+        probabilities, errors, effective = likelihood_weighting(
+            people, samples
+        )
+    else:
+        probabilities, errors = gibbs(people, samples)
+
+    print_probabilities(people, probabilities)
+    worst = max(
+        error for person in errors for field in errors[person]
+        for error in errors[person][field].values()
+    )
+    print(f"Largest standard error: {worst:.4f}")
+    if effective is not None:
+        print(f"Effective sample size: {effective:.0f} of {samples}")
+
+
+class Pedigree():
+    """
+    Family as arrays of person ids, in topological order: everyone comes
+    after their mother and father.
+    """
+
+    def __init__(self, people):
+
+        # Order people so that parents come before their children
+        self.names = []
+        placed = set()
+        remaining = list(people)
+        while remaining:
+            waiting = []
+            for name in remaining:
+                mother, father = people[name]["mother"], people[name]["father"]
+                if (mother is None or father is None
+                        or (mother in placed and father in placed)):
+                    self.names.append(name)
+                    placed.add(name)
+                else:
+                    waiting.append(name)
+            if len(waiting) == len(remaining):
+                raise ValueError("Family contains a cycle of parents")
+            remaining = waiting
+
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.n = len(self.names)
+
+        # Parents of every person, -1 for people without both parents
+        self.mother = np.full(self.n, -1)
+        self.father = np.full(self.n, -1)
+        for i, name in enumerate(self.names):
+            mother, father = people[name]["mother"], people[name]["father"]
+            if mother is not None and father is not None:
+                self.mother[i] = self.index[mother]
+                self.father[i] = self.index[father]
+
+        # Children of every person, with the other parent
+        self.children = [[] for i in range(self.n)]
+        for i in range(self.n):
+            if self.mother[i] >= 0:
+                self.children[self.mother[i]].append((i, self.father[i]))
+                self.children[self.father[i]].append((i, self.mother[i]))
+
+        # Likelihood of observed traits for every number of copies
+        traits = trait_table()
+        self.evidence = np.ones((self.n, 3))
+        self.trait = [people[name]["trait"] for name in self.names]
+        for i, trait in enumerate(self.trait):
+            if trait is not None:
+                self.evidence[i] = traits[:, int(trait)]
+
+
+def sample_genes(pedigree, rng, size):
+    """
+    Sample gene copies for `size` samples from the family's prior,
+    in topological order, and return an array of shape (size, n).
+    """
+    prior = np.cumsum([PROBS["gene"][g] for g in GENES])
+    children = np.cumsum(gene_table(), axis=2)
+
+    genes = np.empty((size, pedigree.n), dtype=np.int64)
+    for i in range(pedigree.n):
+        u = rng.random(size)[:, None]
+        if pedigree.mother[i] < 0:
+            cdf = prior[None, :]
+        else:
+            cdf = children[genes[:, pedigree.mother[i]],
+                           genes[:, pedigree.father[i]]]
+        genes[:, i] = np.minimum((u > cdf).sum(axis=1), 2)
+    return genes
+
+
+def likelihood_batch(people, samples, seed):
+    """
+    Run likelihood weighting with `samples` samples, and return the
+    weighted gene probabilities of every person, the log of the total
+    weight, and the effective sample size of the weights.
+
+    Weights are products of one likelihood per observed trait, which
+    underflow in large families, so they are summed as logs and scaled
+    by the largest before leaving log space.
+    """
+    pedigree = Pedigree(people)
+    rng = np.random.default_rng(seed)
+    genes = sample_genes(pedigree, rng, samples)
+
+    # Weight every sample by the likelihood of the observed traits
+    with np.errstate(divide="ignore"):
+        log_evidence = np.log(pedigree.evidence)
+    log_weights = np.zeros(samples)
+    for i in range(pedigree.n):
+        log_weights += log_evidence[i, genes[:, i]]
+
+    gene_sums = np.zeros((pedigree.n, 3))
+    top = log_weights.max()
+    if top == -np.inf:
+        return gene_sums, -np.inf, 0.0
+    weights = np.exp(log_weights - top)
+    total = weights.sum()
+
+    for i in range(pedigree.n):
+        gene_sums[i] = np.bincount(genes[:, i], weights, minlength=3)
+    effective = total ** 2 / (weights ** 2).sum()
+    return gene_sums / total, top + np.log(total), effective
+
+
+def gibbs_batch(people, samples, seed, chains=CHAINS, burn_in=BURN_IN):
+    """
+    Run `chains` Gibbs sampling chains side by side until `samples`
+    samples have been kept, after `burn_in` discarded sweeps.
+
+    Every sweep resamples each person's gene copies in topological order
+    from its distribution given everyone else: their parents, their own
+    observed trait, and their children with the children's other parent.
+
+    Return the gene probabilities of every person from the samples
+    kept, the log of their number, and their number.
+    """
+    pedigree = Pedigree(people)
+    rng = np.random.default_rng(seed)
+    table = gene_table()
+    prior = np.array([PROBS["gene"][g] for g in GENES])
+
+    # Start chains from the prior
+    genes = sample_genes(pedigree, rng, chains)
+    rows = np.arange(chains)
+
+    sweeps = burn_in + -(-samples // chains)
+    counts = np.zeros((pedigree.n, 3))
+    for sweep in range(sweeps):
+        for i in range(pedigree.n):
+
+            # Gene copies given parents, times observed trait
+            if pedigree.mother[i] < 0:
+                p = np.tile(prior * pedigree.evidence[i], (chains, 1))
+            else:
+                p = table[genes[:, pedigree.mother[i]],
+                          genes[:, pedigree.father[i]]] * pedigree.evidence[i]
+
+            # Times the probability of each child's gene copies
+            for child, other in pedigree.children[i]:
+                if pedigree.mother[child] == i:
+                    p *= table[:, genes[:, other], genes[:, child]].T
+                else:
+                    p *= table[genes[:, other], :, genes[:, child]]
+
+            cdf = np.cumsum(p, axis=1)
+            u = rng.random(chains) * cdf[:, 2]
+            genes[:, i] = np.minimum((u[:, None] > cdf).sum(axis=1), 2)
+
+        if sweep >= burn_in:
+            for i in range(pedigree.n):
+                counts[i] += np.bincount(genes[:, i], minlength=3)
+
+    kept = (sweeps - burn_in) * chains
+    return counts / kept, np.log(kept), kept
+
+
+def _run_batch(args):
+    """
+    Unpack arguments for a batch function so it can be used with `map`.
+    """
+    batch, people, samples, seed = args
+    return batch(people, samples, seed)
+
+
+def run_batches(batch, people, samples, batches, processes, seed):
+    """
+    Split `samples` over `batches` independent runs of `batch`, each with
+    its own random stream spawned from `seed`, across `processes`
+    processes. Return the per-batch gene probabilities, each person's
+    rows summing to 1, the overall estimate, and the sample size of
+    every batch.
+
+    Batches are weighted by their total weight, combined from the log
+    totals with log-sum-exp so that tiny totals do not underflow.
+    """
+    seeds = np.random.SeedSequence(seed).generate_state(batches)
+    tasks = [
+        (batch, people, max(1, samples // batches), int(s)) for s in seeds
+    ]
+
+    if processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            results = list(executor.map(_run_batch, tasks))
+    else:
+        results = [_run_batch(task) for task in tasks]
+
+    estimates = np.array([estimate for estimate, _, _ in results])
+    log_totals = np.array([log_total for _, log_total, _ in results])
+    sizes = np.array([size for _, _, size in results])
+
+    top = log_totals.max()
+    if top == -np.inf:
+        raise ValueError("Observed traits have probability 0")
+    shares = np.exp(log_totals - top)
+    overall = np.tensordot(shares / shares.sum(), estimates, axes=1)
+    return estimates, overall, sizes
+
+
+def to_probabilities(people, estimates, overall):
+    """
+    Turn per-batch and overall gene probability arrays into
+    `probabilities` and `errors` dictionaries, with the standard error
+    of every value across batches.
+    """
+    pedigree = Pedigree(people)
+    traits = trait_table()[:, 1]
+    batches = len(estimates)
+
+    # Trait probabilities follow from gene probabilities
+    trait_estimates = estimates @ traits
+    trait_overall = overall @ traits
+    gene_errors = estimates.std(axis=0, ddof=1) / np.sqrt(batches)
+    trait_errors = trait_estimates.std(axis=0, ddof=1) / np.sqrt(batches)
+
+    probabilities = {}
+    errors = {}
+    for person in people:
+        i = pedigree.index[person]
+        if pedigree.trait[i] is None:
+            has_trait, trait_error = trait_overall[i], trait_errors[i]
+        else:
+            has_trait, trait_error = float(pedigree.trait[i]), 0
+        probabilities[person] = {
+            "gene": {g: float(overall[i, g]) for g in reversed(GENES)},
+            "trait": {True: float(has_trait), False: float(1 - has_trait)}
+        }
+        errors[person] = {
+            "gene": {g: float(gene_errors[i, g]) for g in reversed(GENES)},
+            "trait": {True: float(trait_error), False: float(trait_error)}
+        }
+    return probabilities, errors
+
+
+def likelihood_weighting(people, samples=SAMPLES, processes=1, seed=None,
+                         batches=BATCHES):
+    """
+    Estimate gene and trait probabilities for everyone in `people` by
+    likelihood weighting: gene copies are sampled parents first, and
+    every sample is weighted by the probability of the observed traits.
+
+    Return `probabilities`, in the same structure as `heredity.main`,
+    `errors`, the standard error of every value in that structure, and
+    the effective sample size of all batches together. When weights
+    collapse onto a few samples the standard errors understate the
+    error, so that is warned about.
+    """
+    estimates, overall, sizes = run_batches(
+        likelihood_batch, people, samples, batches, processes, seed
+    )
+    if sizes.min() < MIN_EFFECTIVE:
+        warnings.warn(
+            f"Effective sample size of a batch is only {sizes.min():.1f}; "
+            "standard errors are unreliable", RuntimeWarning
+        )
+    return (*to_probabilities(people, estimates, overall), sizes.sum())
+
+
+def gibbs(people, samples=SAMPLES, processes=1, seed=None,
+          batches=BATCHES):
+    """
+    Estimate gene and trait probabilities for everyone in `people` by
+    Gibbs sampling over gene copies, with `batches` independent groups
+    of chains spread across `processes` processes.
+
+    Return `probabilities`, in the same structure as `heredity.main`,
+    and `errors`, the standard error of every value in that structure.
+    """
+    estimates, overall, _ = run_batches(
+        gibbs_batch, people, samples, batches, processes, seed
+    )
+    return to_probabilities(people, estimates, overall)
+
+
+if __name__ == "__main__":
+    main()
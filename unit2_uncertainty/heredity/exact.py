@@ -0,0 +1,227 @@
+import heapq
+import sys
+
+import numpy as np
+
+from heredity import PROBS, get_gene_prob, load_data, print_probabilities
+
+GENES = [0, 1, 2]
+
+
+def main():
+
+    # Check for proper usage
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python exact.py data.csv")
+    people = load_data(sys.argv[1])
+
+    probabilities = infer(people)
+    print_probabilities(people, probabilities)
+
+
+def gene_table():
+    """
+    Return an array `table` where `table[m, f, c]` is the probability
+    that a child has `c` copies of the gene, given that the mother has
+    `m` copies and the father has `f` copies.
+    """
+    table = np.zeros((3, 3, 3))
+    for m in GENES:
+        for f in GENES:
+            pm = get_gene_prob(m, True)
+            pf = get_gene_prob(f, True)
+            table[m, f, 2] = pm * pf
+            table[m, f, 1] = pm * (1 - pf) + (1 - pm) * pf
+            table[m, f, 0] = (1 - pm) * (1 - pf)
+    return table
+
+
+def trait_table():
+    """
+    Return an array `table` where `table[g, t]` is the probability of
+    having the trait (t = 1) or not (t = 0) given `g` copies of the gene.
+    """
+    return np.array([
+        [PROBS["trait"][g][False], PROBS["trait"][g][True]] for g in GENES
+    ])
+
+
+def gene_factors(people):
+    """
+    Return the factors of the Bayesian network over the number of gene
+    copies of every person, as a list of (scope, array) pairs where
+    scope is a tuple of names, one for each axis of the array.
+
+    Observed traits are evidence and are folded into the factor of the
+    person they belong to. Like `joint_probability`, anyone without both
+    a mother and a father is given the unconditional gene distribution.
+    """
+    children = gene_table()
+    traits = trait_table()
+    prior = np.array([PROBS["gene"][g] for g in GENES])
+
+    factors = []
+    for person, data in people.items():
+        if data["trait"] is None:
+            evidence = np.ones(3)
+        else:
+            evidence = traits[:, int(data["trait"])]
+
+        mother, father = data["mother"], data["father"]
+        if mother is None or father is None:
+            factors.append(((person,), prior * evidence))
+        else:
+            factors.append(
+                ((mother, father, person), children * evidence)
+            )
+    return factors
+
+
+def multiply(a, b):
+    """
+    Return the product of factors `a` and `b`.
+    """
+    a_scope, a_table = a
+    b_scope, b_table = b
+    scope = a_scope + tuple(v for v in b_scope if v not in a_scope)
+    axis = {v: i for i, v in enumerate(scope)}
+    table = np.einsum(
+        a_table, [axis[v] for v in a_scope],
+        b_table, [axis[v] for v in b_scope],
+        list(range(len(scope)))
+    )
+    return scope, table
+
+
+def sum_out(factor, keep):
+    """
+    Return `factor` with every variable not in `keep` summed out,
+    scaled to sum to 1 to keep long products from underflowing.
+    """
+    scope, table = factor
+    axes = tuple(i for i, v in enumerate(scope) if v not in keep)
+    table = table.sum(axis=axes)
+    total = table.sum()
+    if total > 0:
+        table = table / total
+    return tuple(v for v in scope if v in keep), table
+
+
+def product(factors):
+    """
+    Return the product of a list of factors.
+    """
+    result = ((), np.array(1.0))
+    for factor in factors:
+        result = multiply(result, factor)
+    return result
+
+
+def elimination_order(factors):
+    """
+    Return an order in which to eliminate the variables of `factors`,
+    chosen greedily by smallest number of neighbours, along with the
+    set of neighbours of every variable when it is eliminated.
+    """
+    neighbors = {}
+    for scope, _ in factors:
+        for v in scope:
+            neighbors.setdefault(v, set()).update(u for u in scope if u != v)
+
+    heap = [(len(nbrs), v) for v, nbrs in neighbors.items()]
+    heapq.heapify(heap)
+
+    order = []
+    separators = {}
+    eliminated = set()
+    while heap:
+        degree, v = heapq.heappop(heap)
+
+        # Skip entries made stale by later changes to the neighbours
+        if v in eliminated or degree != len(neighbors[v]):
+            continue
+
+        # Connect all neighbours of v, then remove v from the graph
+        nbrs = neighbors[v]
+        for u in nbrs:
+            neighbors[u].discard(v)
+            neighbors[u].update(w for w in nbrs if w != u)
+            heapq.heappush(heap, (len(neighbors[u]), u))
+
+        order.append(v)
+        separators[v] = set(nbrs)
+        eliminated.add(v)
+
+    return order, separators
+
+
+def infer(people):
+    """
+    Compute the probability distribution of gene copies and trait for
+    everyone in `people`, given all observed traits, by belief
+    propagation on a junction tree of the family's Bayesian network.
+
+    The tree has one clique per person, made of that person and their
+    neighbours when variables are eliminated in `elimination_order`.
+    Two passes of messages over the tree give every marginal at the cost
+    of a single variable elimination, so the work grows linearly with
+    the number of people for pedigrees without much inbreeding.
+
+    Return the same `probabilities` structure as `heredity.main`.
+    """
+    factors = gene_factors(people)
+    order, separators = elimination_order(factors)
+    position = {v: i for i, v in enumerate(order)}
+
+    # Each clique's parent is the clique of its earliest-eliminated
+    # separator variable, which keeps the running intersection property
+    parent = {}
+    children = {v: [] for v in order}
+    for v in order:
+        if separators[v]:
+            parent[v] = min(separators[v], key=position.get)
+            children[parent[v]].append(v)
+
+    # Assign each factor to the clique of its earliest-eliminated variable
+    assigned = {v: [] for v in order}
+    for factor in factors:
+        assigned[min(factor[0], key=position.get)].append(factor)
+    potentials = {v: product(assigned[v]) for v in order}
+
+    # Collect messages from the leaves towards the roots
+    up = {}
+    for v in order:
+        factor = product([potentials[v]] + [up[c] for c in children[v]])
+        if v in parent:
+            up[v] = sum_out(factor, separators[v])
+
+    # Distribute messages from the roots back to the leaves
+    down = {}
+    marginals = {}
+    for v in reversed(order):
+        incoming = [potentials[v]] + ([down[v]] if v in down else [])
+        for c in children[v]:
+            others = [up[o] for o in children[v] if o is not c]
+            down[c] = sum_out(product(incoming + others), separators[c])
+
+        belief = product(incoming + [up[c] for c in children[v]])
+        marginals[v] = sum_out(belief, {v})[1]
+
+    traits = trait_table()
+    probabilities = {}
+    for person in people:
+        genes = marginals[person]
+        trait = people[person]["trait"]
+        if trait is None:
+            has_trait = float(genes @ traits[:, 1])
+        else:
+            has_trait = float(trait)
+        probabilities[person] = {
+            "gene": {g: float(genes[g]) for g in reversed(GENES)},
+            "trait": {True: has_trait, False: 1 - has_trait}
+        }
+    return probabilities
+
+
+if __name__ == "__main__":
+    main()
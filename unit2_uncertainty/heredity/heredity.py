@@ -2,6 +2,8 @@ import csv
 import itertools
 import sys
 
+from concurrent.futures import ProcessPoolExecutor
+
 PROBS = {
 
     # Unconditional probabilities for having gene
@@ -39,49 +41,22 @@ PROBS = {
 def main():
 
     # Check for proper usage
-    if len(sys.argv) != 2:
-        sys.exit("Usage: python heredity.py data.csv")
+    if len(sys.argv) not in [2, 3]:
+        sys.exit("Usage: python heredity.py data.csv [processes]")
     people = load_data(sys.argv[1])
+    processes = int(sys.argv[2]) if len(sys.argv) == 3 else 1
 
-    # Keep track of gene and trait probabilities for each person
-    probabilities = {
-        person: {
-            "gene": {
-                2: 0,
-                1: 0,
-                0: 0
-            },
-            "trait": {
-                True: 0,
-                False: 0
-            }
-        }
-        for person in people
-    }
-
-    # Loop over all sets of people who might have the trait
-    names = set(people)
-    for have_trait in powerset(names):
+    # Enumerate all assignments consistent with known information
+    probabilities = enumerate_probabilities(people, processes)
 
-        # Check if current set of people violates known information
-        fails_evidence = any(
-            (people[person]["trait"] is not None and people[person]["trait"] !=
-             (person in have_trait)) for person in names)
-        if fails_evidence:
-            continue
-
-        # Loop over all sets of people who might have the gene
-        for one_gene in powerset(names):
-            for two_genes in powerset(names - one_gene):
-
-                # Update probabilities with new joint probability
-                p = joint_probability(people, one_gene, two_genes, have_trait)
-                update(probabilities, one_gene, two_genes, have_trait, p)
+    # Print results
+    print_probabilities(people, probabilities)
 
-    # Ensure probabilities sum to 1
-    normalize(probabilities)
 
-    # Print results
+def print_probabilities(people, probabilities):
+    """
+    Print gene and trait probabilities for every person.
+    """
     for person in people:
         print(f"{person}:")
         for field in probabilities[person]:
@@ -127,6 +102,209 @@ def powerset(s):
     ]
 
 
+def empty_probabilities(people):
+    """
+    Return a `probabilities` dictionary with every probability set to 0.
+    """
+    return {
+        person: {
+            "gene": {
+                2: 0,
+                1: 0,
+                0: 0
+            },
+            "trait": {
+                True: 0,
+                False: 0
+            }
+        }
+        for person in people
+    }
+
+
+def count_assignments(people):
+    """
+    Return the number of ways to assign gene copies to everyone.
+    """
+    return 3 ** len(people)
+
+
+def aligned_blocks(start, stop):
+    """
+    Split the numbers `start` to `stop` - 1 into blocks of 3 ** m numbers
+    starting at a multiple of 3 ** m, and yield each block as (first, m).
+    """
+    while start < stop:
+        m = 0
+        while start % 3 ** (m + 1) == 0 and start + 3 ** (m + 1) <= stop:
+            m += 1
+        yield start, m
+        start += 3 ** m
+
+
+def enumerate_range(people, start, stop):
+    """
+    Return unnormalized `probabilities` summed over the gene assignments
+    numbered `start` to `stop` - 1.
+
+    Assignment k gives the i-th person in `people` the i-th base 3 digit
+    of k as their number of gene copies. The range is cut into blocks in
+    which the last people's digits are fixed and the first people take
+    every value, see `aligned_blocks`, and each block is searched depth
+    first from the last person down. Every factor of the joint
+    probability comes from a lookup table and is multiplied in once all
+    of its people are decided, so the product is shared by every
+    assignment below, and the probability of each subtree is added to the
+    marginal of the person decided at its root.
+
+    People whose trait is known only ever get that trait. The traits of
+    everyone else are summed out: their factors are left out, and their
+    trait probabilities follow from their gene probabilities.
+    """
+    names = list(people)
+    n = len(names)
+    index = {name: i for i, name in enumerate(names)}
+
+    # Factor of each person's own gene copies and known trait
+    own = []
+    for name in names:
+        founder = (people[name]["mother"] is None
+                   or people[name]["father"] is None)
+        trait = people[name]["trait"]
+        own.append([
+            (PROBS["gene"][g] if founder else 1)
+            * (1 if trait is None else PROBS["trait"][g][trait])
+            for g in range(3)
+        ])
+
+    # Probability of a child's copies given their parents' copies:
+    # inherit[mother][father][child]
+    inherit = [
+        [
+            [
+                get_gene_prob(mother, False) * get_gene_prob(father, False),
+                get_gene_prob(mother, True) * get_gene_prob(father, False)
+                + get_gene_prob(mother, False) * get_gene_prob(father, True),
+                get_gene_prob(mother, True) * get_gene_prob(father, True)
+            ]
+            for father in range(3)
+        ]
+        for mother in range(3)
+    ]
+
+    # Inheritance factors by the person deciding them: the lowest
+    # numbered of the child and both parents, as people are decided from
+    # the last down
+    completes = [[] for _ in range(n)]
+    for name in names:
+        if people[name]["mother"] is None or people[name]["father"] is None:
+            continue
+        child = index[name]
+        mother = index[people[name]["mother"]]
+        father = index[people[name]["father"]]
+        completes[min(child, mother, father)].append((child, mother, father))
+
+    genes = [0] * n
+    gene_sums = [[0, 0, 0] for _ in range(n)]
+
+    def factor(i):
+        """
+        Return the factors decided by person i, given `genes`.
+        """
+        p = own[i][genes[i]]
+        for child, mother, father in completes[i]:
+            p *= inherit[genes[mother]][genes[father]][genes[child]]
+        return p
+
+    def search(i, p):
+        """
+        Sum `p` times every assignment of people i down to 0, adding the
+        sum for each value of person i to their marginal, and return it.
+        """
+        if i < 0:
+            return p
+        total = 0
+        for g in range(3):
+            genes[i] = g
+            q = p * factor(i)
+            if q:
+                t = search(i - 1, q)
+                gene_sums[i][g] += t
+                total += t
+        return total
+
+    for first, m in aligned_blocks(start, stop):
+
+        # Fixed people from the last down to m
+        k = first // 3 ** m
+        p = 1
+        for i in range(m, n):
+            k, genes[i] = divmod(k, 3)
+        for i in range(n - 1, m - 1, -1):
+            p *= factor(i)
+        if not p:
+            continue
+
+        total = search(m - 1, p)
+        for i in range(m, n):
+            gene_sums[i][genes[i]] += total
+
+    probabilities = empty_probabilities(people)
+    for i, name in enumerate(names):
+        trait = people[name]["trait"]
+        for g in range(3):
+            p = gene_sums[i][g]
+            probabilities[name]["gene"][g] += p
+            if trait is None:
+                for value in [True, False]:
+                    probabilities[name]["trait"][value] += (
+                        p * PROBS["trait"][g][value]
+                    )
+            else:
+                probabilities[name]["trait"][trait] += p
+
+    return probabilities
+
+
+def _enumerate_range(args):
+    """
+    Unpack arguments for `enumerate_range` so it can be used with `map`.
+    """
+    return enumerate_range(*args)
+
+
+def enumerate_probabilities(people, processes=1):
+    """
+    Return normalized `probabilities` for everyone in `people`, splitting
+    the gene assignments into disjoint ranges enumerated by a pool of
+    `processes` processes, and adding up their results.
+    """
+    total = count_assignments(people)
+    chunks = processes * 4 if processes > 1 else 1
+    bounds = [total * i // chunks for i in range(chunks + 1)]
+    tasks = [
+        (people, bounds[i], bounds[i + 1]) for i in range(chunks)
+    ]
+
+    if processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            parts = list(executor.map(_enumerate_range, tasks))
+    else:
+        parts = [_enumerate_range(task) for task in tasks]
+
+    # Merge partial sums
+    probabilities = empty_probabilities(people)
+    for part in parts:
+        for person in part:
+            for field in part[person]:
+                for value, p in part[person][field].items():
+                    probabilities[person][field][value] += p
+
+    # Ensure probabilities sum to 1
+    normalize(probabilities)
+    return probabilities
+
+
 def joint_probability(people, one_gene, two_genes, have_trait):
     """
     Compute and return a joint probability.
@@ -0,0 +1,113 @@
+import sys
+
+import numpy as np
+
+from exact import GENES, gene_table, trait_table
+from heredity import PROBS, load_data, print_probabilities
+
+# Number of assignments evaluated at once
+BLOCK_SIZE = 1 << 16
+
+
+def main():
+
+    # Check for proper usage
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python vectorized.py data.csv")
+    people = load_data(sys.argv[1])
+
+    probabilities = enumerate_probabilities(people)
+    print_probabilities(people, probabilities)
+
+
+def enumerate_probabilities(people, block_size=BLOCK_SIZE):
+    """
+    Compute the probability distribution of gene copies and trait for
+    everyone in `people` by enumerating every joint assignment, like
+    `heredity.main`, but `block_size` assignments at a time with NumPy.
+
+    Each assignment is a row of integers: the number of gene copies of
+    every person, then the trait of every person whose trait is unknown.
+    Observed traits are fixed up front, so assignments that contradict
+    the evidence are never generated.
+
+    Return the same `probabilities` structure as `heredity.main`.
+    """
+    names = list(people)
+    n = len(names)
+    index = {name: i for i, name in enumerate(names)}
+    unknown = [i for i, name in enumerate(names)
+               if people[name]["trait"] is None]
+
+    # Mixed-radix digits: 3 values per gene, then 2 per unknown trait
+    bases = np.array([3] * n + [2] * len(unknown), dtype=np.int64)
+    places = np.concatenate(([1], np.cumprod(bases[:-1])))
+    total = int(np.prod(bases))
+
+    # Lookup tables for every factor of the joint probability
+    children = gene_table()
+    traits = trait_table()
+    prior = np.array([PROBS["gene"][g] for g in GENES])
+    parents = [
+        (i, index[people[name]["mother"]], index[people[name]["father"]])
+        for i, name in enumerate(names)
+        if people[name]["mother"] is not None
+        and people[name]["father"] is not None
+    ]
+    founders = [i for i in range(n) if i not in {c for c, _, _ in parents}]
+    observed = [
+        (i, int(people[name]["trait"])) for i, name in enumerate(names)
+        if people[name]["trait"] is not None
+    ]
+
+    gene_sums = np.zeros((n, 3))
+    trait_sums = np.zeros((n, 2))
+    rows = np.arange(n)
+    columns = np.arange(len(unknown))
+
+    for start in range(0, total, block_size):
+        assignments = np.arange(start, min(start + block_size, total))
+        digits = (assignments[:, None] // places) % bases
+        genes = digits[:, :n]
+        unknown_traits = digits[:, n:]
+
+        # Joint probability of every assignment in the block
+        p = np.ones(len(assignments))
+        for i in founders:
+            p *= prior[genes[:, i]]
+        for child, mother, father in parents:
+            p *= children[genes[:, mother], genes[:, father], genes[:, child]]
+        for i, trait in observed:
+            p *= traits[genes[:, i], trait]
+        for k, i in enumerate(unknown):
+            p *= traits[genes[:, i], unknown_traits[:, k]]
+
+        # Accumulate marginals, with one bin per (person, value) pair
+        gene_sums += np.bincount(
+            (genes * n + rows).ravel(), np.repeat(p, n), minlength=3 * n
+        ).reshape(3, n).T
+        trait_sums[unknown] += np.bincount(
+            (unknown_traits * len(unknown) + columns).ravel(),
+            np.repeat(p, len(unknown)), minlength=2 * len(unknown)
+        ).reshape(2, len(unknown)).T
+
+    for i, trait in observed:
+        trait_sums[i, trait] = 1
+
+    gene_sums /= gene_sums.sum(axis=1, keepdims=True)
+    trait_sums /= trait_sums.sum(axis=1, keepdims=True)
+
+    return {
+        name: {
+            "gene": {g: float(gene_sums[i, g]) for g in reversed(GENES)},
+            "trait": {
+                True: float(trait_sums[i, 1]),
+                False: float(trait_sums[i, 0])
+            }
+        }
+        for i, name in enumerate(names)
+    }
+
+
+if __name__ == "__main__":
+    main()
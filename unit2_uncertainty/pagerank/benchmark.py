@@ -0,0 +1,106 @@
+import sys
+import time
+
+import numpy as np
+
+from crawler import crawl
+from graph import LinkGraph
+from pagerank import DAMPING
+from power import power_iteration
+from solvers import SOLVERS, solve
+from surfer import sample_error
+
+CORPORA = ["corpus0", "corpus1", "corpus2"]
+
+# Synthetic power-law graphs as (pages, average links per page)
+SYNTHETIC = [(10000, 8), (100000, 8)]
+
+SAMPLES = 1000000
+SEED = 0
+
+
+def main():
+    if len(sys.argv) != 1:
+        sys.exit("Usage: python benchmark.py")
+
+    graphs = [(name, crawl(name)) for name in CORPORA]
+    for N, degree in SYNTHETIC:
+        graph = power_law_graph(N, degree, seed=SEED)
+        graphs.append((f"power-law N={N} links={len(graph.indices)}", graph))
+
+    for name, graph in graphs:
+        print(name)
+        for result in benchmark(graph, DAMPING):
+            print_result(result)
+
+
+def power_law_graph(N, degree, exponent=2.1, seed=None):
+    """
+    Return a random `LinkGraph` over N pages with N * `degree` links,
+    before duplicates are removed. Each link's source and target are
+    drawn independently with probability following a power law with
+    `exponent`, so both link counts are heavy-tailed, and pages never
+    drawn as a source are left without links, like dangling pages.
+    """
+    rng = np.random.default_rng(seed)
+    weights = (np.arange(N) + 1.0) ** (-1 / (exponent - 1))
+    weights /= weights.sum()
+
+    # Independent rankings of pages for links from and links to them
+    sources = rng.permutation(N)[rng.choice(N, size=N * degree, p=weights)]
+    targets = rng.permutation(N)[rng.choice(N, size=N * degree, p=weights)]
+
+    pages = [f"{i}.html" for i in range(N)]
+    return LinkGraph.from_edges(pages, sources, targets)
+
+
+def benchmark(graph, damping_factor, samples=SAMPLES, seed=SEED):
+    """
+    Run every solver, and sampling with `samples` samples, on `graph`.
+
+    Return a list of result dictionaries with the solver "name",
+    "iterations", "time", "memory", and "error": the L1 distance to a
+    reference solution computed by power iteration to 1e-14.
+    """
+    reference = power_iteration(graph, damping_factor, tolerance=1e-14)
+
+    results = []
+    for method in SOLVERS:
+        ranks, trace = solve(graph, damping_factor, method)
+        results.append({
+            "name": method,
+            "iterations": trace["iterations"],
+            "time": trace["time"],
+            "memory": trace["memory"],
+            "error": float(np.abs(ranks - reference).sum()),
+            "residuals": trace["residuals"]
+        })
+
+    start = time.perf_counter()
+    ranks, error = sample_error(graph, damping_factor, samples, seed=seed)
+    results.append({
+        "name": f"sampling (n = {samples})",
+        "iterations": samples,
+        "time": time.perf_counter() - start,
+        "memory": None,
+        "error": float(np.abs(ranks - reference).sum()),
+        "estimated_error": float(error.sum())
+    })
+    return results
+
+
+def print_result(result):
+    """
+    Print one result returned by `benchmark`.
+    """
+    line = (f"  {result['name']:>24}: {result['iterations']:>8} iterations, "
+            f"{result['time']:8.4f}s, L1 error {result['error']:.2e}")
+    if result["memory"] is not None:
+        line += f", peak {result['memory'] / 1024:.0f} KiB"
+    if "estimated_error" in result:
+        line += f", estimated {result['estimated_error']:.2e}"
+    print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import os
+import re
+import sys
+
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor
+
+from graph import LinkGraph
+
+LINK = re.compile(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"")
+
+# Number of characters read from a file at a time
+CHUNK_SIZE = 1 << 16
+
+# Page ids known to each worker process, set by `_init_worker`
+_index = None
+
+
+def main():
+    if len(sys.argv) not in [2, 3]:
+        sys.exit("Usage: python crawler.py corpus [graph.npz]")
+    graph = crawl(sys.argv[1])
+    print(f"Crawled {graph.N} pages, {len(graph.indices)} links")
+    if len(sys.argv) == 3:
+        graph.save(sys.argv[2])
+        print(f"Saved graph to {sys.argv[2]}")
+
+
+def crawl(directory, processes=None):
+    """
+    Parse a directory of HTML pages in a pool of `processes` processes
+    and return the `LinkGraph` of links between pages in the corpus.
+
+    Same pages and links as `pagerank.crawl`, but every worker maps
+    links to page ids itself, so no per-page sets of names are built.
+    """
+    pages = sorted(
+        filename for filename in os.listdir(directory)
+        if filename.endswith(".html")
+    )
+    index = {page: i for i, page in enumerate(pages)}
+    paths = [os.path.join(directory, page) for page in pages]
+
+    # Hand out files in a few chunks per worker to amortize overhead
+    chunksize = max(1, len(pages) // ((processes or os.cpu_count()) * 4))
+    with ProcessPoolExecutor(
+        max_workers=processes, initializer=_init_worker, initargs=(index,)
+    ) as executor:
+        targets = list(executor.map(page_links, paths, chunksize=chunksize))
+
+    sources = np.repeat(
+        np.arange(len(pages)), [len(links) for links in targets]
+    )
+    targets = np.fromiter(
+        (link for links in targets for link in links), dtype=np.int64,
+        count=len(sources)
+    )
+    return LinkGraph.from_edges(pages, sources, targets)
+
+
+def load(path):
+    """
+    Return the `LinkGraph` saved at `path` if it is an `.npz` file,
+    otherwise crawl the directory at `path`.
+    """
+    if path.endswith(".npz"):
+        return LinkGraph.load(path)
+    return crawl(path)
+
+
+def _init_worker(index):
+    """
+    Make the page ids available to `page_links` in a worker process.
+    """
+    global _index
+    _index = index
+
+
+def extract_links(f, chunk_size=CHUNK_SIZE):
+    """
+    Yield the target of every link in the open text file `f`,
+    reading it `chunk_size` characters at a time.
+
+    A tag cut off at the end of a chunk is carried over to the next one.
+    """
+    carry = ""
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+        text = carry + chunk
+
+        # Report complete links, and remember where the last one ended
+        end = 0
+        for match in LINK.finditer(text):
+            yield match.group(1)
+            end = match.end()
+
+        # Keep anything from the last unmatched tag onwards
+        start = text.rfind("<", end)
+        carry = text[start:] if start != -1 else ""
+
+
+def page_links(path):
+    """
+    Return the ids of all pages in the corpus linked to by the page at
+    `path`, not including itself.
+    """
+    own = _index.get(os.path.basename(path))
+    links = set()
+    with open(path) as f:
+        for link in extract_links(f):
+            i = _index.get(link)
+            if i is not None and i != own:
+                links.add(i)
+    return sorted(links)
+
+
+if __name__ == "__main__":
+    main()
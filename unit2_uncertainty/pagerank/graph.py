@@ -0,0 +1,145 @@
+import numpy as np
+import scipy.sparse as sp
+
+
+class LinkGraph():
+    """
+    Link graph of a corpus with pages numbered 0 .. N - 1.
+
+    Outgoing links are stored in compressed sparse row form:
+    the links of page `i` are `indices[indptr[i]:indptr[i + 1]]`.
+    """
+
+    def __init__(self, pages, indptr, indices):
+
+        # Page names, and the id of each page name
+        self.pages = list(pages)
+        self.index = {page: i for i, page in enumerate(self.pages)}
+        self.N = len(self.pages)
+
+        # Outgoing links of every page
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+
+        # Number of links leaving every page, and pages with none
+        self.out_degree = np.diff(self.indptr)
+        self.dangling = self.out_degree == 0
+
+        self._transition = None
+
+    @classmethod
+    def from_corpus(cls, corpus):
+        """
+        Build a graph from a `corpus` dictionary as returned by `crawl`,
+        mapping each page to the set of pages it links to.
+
+        Pages are numbered in sorted order, links to pages outside the
+        corpus and links from a page to itself are ignored.
+        """
+        pages = sorted(corpus)
+        index = {page: i for i, page in enumerate(pages)}
+
+        indptr = [0]
+        indices = []
+        for i, page in enumerate(pages):
+            links = sorted(
+                index[link] for link in corpus[page]
+                if link in index and link != page
+            )
+            indices.extend(links)
+            indptr.append(len(indices))
+
+        return cls(pages, indptr, indices)
+
+    @classmethod
+    def from_edges(cls, pages, sources, targets):
+        """
+        Build a graph over `pages` from parallel arrays of page ids,
+        with one link from `sources[k]` to `targets[k]` for every `k`.
+
+        Duplicate links and links from a page to itself are ignored.
+        """
+        N = len(pages)
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+
+        # Drop self links, then sort and de-duplicate links
+        keep = sources != targets
+        keys = np.sort(sources[keep] * N + targets[keep])
+        if len(keys):
+            keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+        sources, targets = np.divmod(keys, N)
+
+        indptr = np.zeros(N + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=N), out=indptr[1:])
+        return cls(pages, indptr, targets)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a graph saved with `save`.
+        """
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data["pages"].tolist(), data["indptr"], data["indices"])
+
+    def save(self, path):
+        """
+        Save the graph to `path` as a NumPy `.npz` archive holding the
+        page names and the CSR link arrays, using the smallest integer
+        type that fits.
+        """
+        size = max(self.N, len(self.indices))
+        dtype = np.int32 if size < 2 ** 31 else np.int64
+        np.savez(
+            path,
+            pages=np.array(self.pages, dtype=str),
+            indptr=self.indptr.astype(dtype),
+            indices=self.indices.astype(dtype)
+        )
+
+    def to_corpus(self):
+        """
+        Return the graph as a `corpus` dictionary of page name to
+        the set of page names it links to.
+        """
+        return {
+            page: set(
+                self.pages[j]
+                for j in self.indices[self.indptr[i]:self.indptr[i + 1]]
+            )
+            for i, page in enumerate(self.pages)
+        }
+
+    def edges(self):
+        """
+        Return the links of the graph as two arrays of page ids,
+        sources and targets.
+        """
+        sources = np.repeat(np.arange(self.N), self.out_degree)
+        return sources, self.indices.copy()
+
+    def transition(self):
+        """
+        Return the column-stochastic transition matrix over non-dangling
+        pages as a sparse CSR matrix `M`, with `M[j, i]` the probability
+        of following a link from page `i` to page `j`.
+
+        Columns of dangling pages are all zero, their mass is handled
+        separately by the solvers.
+
+        The matrix is built on first use and cached.
+        """
+        if self._transition is None:
+            degree = np.maximum(self.out_degree, 1)
+            sources = np.repeat(np.arange(self.N), self.out_degree)
+            weights = 1 / degree[sources]
+            self._transition = sp.csr_matrix(
+                (weights, (self.indices, sources)), shape=(self.N, self.N)
+            )
+        return self._transition
+
+    def ranks_to_dict(self, ranks):
+        """
+        Return a rank vector as a dictionary of page name to rank.
+        """
+        return {page: float(ranks[i]) for i, page in enumerate(self.pages)}
@@ -0,0 +1,211 @@
+import os
+import sys
+
+import numpy as np
+
+from crawler import load
+from graph import LinkGraph
+from pagerank import DAMPING
+from power import MAX_ITERATIONS, TOLERANCE, power_iteration, step
+
+# Residuals pushed in a round, as a multiple of the mean residual
+PUSH_THRESHOLD = 16
+
+
+def main():
+    if len(sys.argv) != 3:
+        sys.exit("Usage: python incremental.py state.npz corpus|graph.npz")
+    path = sys.argv[1]
+    graph = load(sys.argv[2])
+
+    # Push residuals from the last ranks if there are any
+    if os.path.exists(path):
+        old_graph, old_ranks = load_state(path)
+        start = carry_ranks(old_graph, old_ranks, graph)
+        print(f"Warm start from {path}")
+        ranks = push_update(graph, DAMPING, start=start, log=True)
+    else:
+        print("Cold start")
+        ranks = power_iteration(graph, DAMPING, log=True)
+    save_state(path, graph, ranks)
+
+    print("PageRank Results from Incremental Iteration")
+    ranks = graph.ranks_to_dict(ranks)
+    for page in sorted(ranks):
+        print(f"  {page}: {ranks[page]:.4f}")
+
+
+def load_state(path):
+    """
+    Load a graph and its rank vector saved with `save_state`.
+    """
+    with np.load(path, allow_pickle=False) as data:
+        graph = LinkGraph(
+            data["pages"].tolist(), data["indptr"], data["indices"]
+        )
+        ranks = data["ranks"]
+    return graph, ranks
+
+
+def save_state(path, graph, ranks):
+    """
+    Save `graph` and its rank vector `ranks` to the `.npz` file `path`.
+    """
+    np.savez(
+        path,
+        pages=np.array(graph.pages, dtype=str),
+        indptr=graph.indptr,
+        indices=graph.indices,
+        ranks=ranks
+    )
+
+
+def apply_delta(graph, delta):
+    """
+    Return a new `LinkGraph` with the changes in `delta` applied to `graph`.
+
+    `delta` is a dictionary with any of the keys:
+        - "add_pages": names of pages to add
+        - "remove_pages": names of pages to remove, with all their links
+        - "add_links": (source, target) page name pairs to link
+        - "remove_links": (source, target) page name pairs to unlink
+
+    Surviving pages keep their relative order, and new pages are added
+    at the end. Links involving pages not in the new graph are ignored.
+    """
+    removed = set(delta.get("remove_pages", ()))
+    pages = [page for page in graph.pages if page not in removed]
+    known = set(pages)
+    for page in delta.get("add_pages", ()):
+        if page not in known:
+            pages.append(page)
+            known.add(page)
+    index = {page: i for i, page in enumerate(pages)}
+    N = len(pages)
+
+    # Map old page ids to new ones, with -1 for removed pages
+    ids = np.array(
+        [index.get(page, -1) for page in graph.pages], dtype=np.int64
+    )
+    sources, targets = graph.edges()
+    sources, targets = ids[sources], ids[targets]
+    keep = (sources >= 0) & (targets >= 0)
+    sources, targets = sources[keep], targets[keep]
+
+    # Remove links
+    unlinked = link_keys(delta.get("remove_links", ()), index)
+    if len(unlinked):
+        keep = ~np.isin(sources * N + targets, unlinked)
+        sources, targets = sources[keep], targets[keep]
+
+    # Add links
+    linked = link_keys(delta.get("add_links", ()), index)
+    sources = np.concatenate((sources, linked // N))
+    targets = np.concatenate((targets, linked % N))
+
+    return LinkGraph.from_edges(pages, sources, targets)
+
+
+def link_keys(links, index):
+    """
+    Return (source, target) page name pairs as an array of integer keys
+    `source * N + target`, skipping pairs with a page not in `index`.
+    """
+    N = len(index)
+    return np.array([
+        index[source] * N + index[target]
+        for source, target in links
+        if source in index and target in index
+    ], dtype=np.int64)
+
+
+def carry_ranks(old_graph, old_ranks, graph):
+    """
+    Return a starting rank vector for `graph` from the ranks `old_ranks`
+    of `old_graph`: pages keep their old rank, new pages start at 1 / N,
+    and the result is normalized to sum to 1.
+    """
+    start = np.full(graph.N, 1 / graph.N)
+    for i, page in enumerate(old_graph.pages):
+        j = graph.index.get(page)
+        if j is not None:
+            start[j] = old_ranks[i]
+    return start / start.sum()
+
+
+def push_update(graph, damping_factor, tolerance=TOLERANCE,
+                max_iterations=MAX_ITERATIONS, start=None, log=False):
+    """
+    Return the PageRank vector of `graph` by pushing residuals from
+    `start`, or the uniform distribution, until the L1 change one more
+    power iteration would make is below `tolerance`.
+
+    The residual of the start is what one step of the random surfer
+    would change. Pushing a page's residual adds it to the page's rank
+    and passes the damped share of it along each of the page's links,
+    so only pages near large residuals do any work. When `start` holds
+    the ranks of a slightly different graph, the residual is confined
+    to the pages around the changed links, and a refresh costs a small
+    fraction of a full iteration on top of the one step that finds the
+    residual.
+
+    A uniform residual, from dangling pages or a change in the number
+    of pages, only changes the result by a multiple of the PageRank
+    vector itself, so it is dropped and the result is renormalized.
+    Each round pushes every page whose residual is at least the mean,
+    which always includes the largest.
+    """
+    if start is None:
+        ranks = np.full(graph.N, 1 / graph.N)
+    else:
+        ranks = np.asarray(start, dtype=float) / np.sum(start)
+
+    residual = step(graph, ranks, damping_factor) - ranks
+    residual -= np.median(residual)
+    pushed = 0
+
+    for i in range(max_iterations):
+        size = np.abs(residual).sum()
+        if size < tolerance:
+            break
+
+        # Push every page with at least the mean residual
+        active = np.flatnonzero(np.abs(residual) * graph.N >= size)
+        values = residual[active]
+        residual[active] = 0
+        ranks[active] += values
+
+        # Along every link of pages with links, in CSR order
+        degree = graph.out_degree[active]
+        linked = degree > 0
+        sources, degree = active[linked], degree[linked]
+        offsets = np.repeat(
+            graph.indptr[sources] - np.cumsum(degree) + degree, degree
+        )
+        targets = graph.indices[offsets + np.arange(degree.sum())]
+        shares = np.repeat(damping_factor * values[linked] / degree, degree)
+        np.add.at(residual, targets, shares)
+        pushed += len(targets)
+
+    if log:
+        print(f"Push update: {i} rounds, {pushed} links pushed "
+              f"({pushed / max(len(graph.indices), 1):.2f} iterations), "
+              f"residual {size:.2e}")
+    return ranks / ranks.sum()
+
+
+def update(graph, ranks, delta, damping_factor, tolerance=TOLERANCE):
+    """
+    Apply `delta` (see `apply_delta`) to `graph`, and return the new graph
+    with its PageRank vector, pushed from the previous `ranks`, see
+    `push_update`.
+    """
+    new_graph = apply_delta(graph, delta)
+    start = carry_ranks(graph, ranks, new_graph)
+    return new_graph, push_update(
+        new_graph, damping_factor, tolerance, start=start
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import sys
+
+import numpy as np
+
+from crawler import load
+from graph import LinkGraph
+from pagerank import DAMPING
+from power import TOLERANCE, power_iteration
+
+# Number of pages reported for each seed set
+TOP_K = 5
+
+
+def main():
+    if len(sys.argv) < 3:
+        sys.exit("Usage: python personalized.py corpus|graph.npz page ...")
+    graph = load(sys.argv[1])
+    seeds = [[page] for page in sys.argv[2:]]
+    for page in sys.argv[2:]:
+        if page not in graph.index:
+            sys.exit(f"{page} is not in the corpus")
+
+    ranks = personalized_ranks(graph, seeds, DAMPING)
+    for page, top in zip(sys.argv[2:], top_k(graph, ranks, TOP_K)):
+        print(f"Personalized PageRank Results for {page}")
+        for other, rank in top:
+            print(f"  {other}: {rank:.4f}")
+
+
+def personalized_pagerank(corpus, seeds, damping_factor,
+                          tolerance=TOLERANCE, k=None):
+    """
+    Return personalized PageRank values for every seed set in `seeds`.
+
+    Each seed set is either a collection of pages, teleported to with
+    equal probability, or a dictionary mapping pages to teleport weights.
+
+    Return a list with one entry per seed set: a dictionary of page name
+    to PageRank value or, if `k` is given, a list of the `k` pages with
+    highest PageRank as (page, value) pairs.
+    """
+    graph = LinkGraph.from_corpus(corpus)
+    ranks = personalized_ranks(graph, seeds, damping_factor, tolerance)
+    if k is not None:
+        return top_k(graph, ranks, k)
+    return [graph.ranks_to_dict(column) for column in ranks.T]
+
+
+def teleport_matrix(graph, seeds):
+    """
+    Return an N x K matrix whose columns are the teleport distributions
+    of the K seed sets in `seeds`, see `personalized_pagerank`.
+
+    Pages not in the graph are ignored, and a seed set with no pages
+    in the graph teleports uniformly.
+    """
+    teleport = np.zeros((graph.N, len(seeds)))
+    for column, seed in enumerate(seeds):
+        if not isinstance(seed, dict):
+            seed = {page: 1 for page in seed}
+        for page, weight in seed.items():
+            if page in graph.index:
+                teleport[graph.index[page], column] += weight
+
+    # Normalize every column to sum to 1
+    totals = teleport.sum(axis=0)
+    teleport[:, totals == 0] = 1
+    totals[totals == 0] = graph.N
+    return teleport / totals
+
+
+def personalized_ranks(graph, seeds, damping_factor, tolerance=TOLERANCE):
+    """
+    Return an N x K matrix of personalized PageRank vectors of `graph`,
+    one column per seed set in `seeds`, computed together by power
+    iteration with one sparse matrix-matrix product per iteration.
+    """
+    teleport = teleport_matrix(graph, seeds)
+    return power_iteration(graph, damping_factor, tolerance, teleport=teleport)
+
+
+def top_k(graph, ranks, k):
+    """
+    Return, for every column of the N x K rank matrix `ranks`, the `k`
+    pages with highest rank as a list of (page, rank) pairs, best first.
+    """
+    k = min(k, graph.N)
+    best = np.argpartition(-ranks, k - 1, axis=0)[:k]
+    results = []
+    for column in range(ranks.shape[1]):
+        pages = best[:, column]
+        pages = pages[np.argsort(-ranks[pages, column], kind="stable")]
+        results.append([
+            (graph.pages[i], float(ranks[i, column])) for i in pages
+        ])
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import sys
+
+import numpy as np
+
+from crawler import load
+from graph import LinkGraph
+from pagerank import DAMPING
+
+TOLERANCE = 1e-8
+MAX_ITERATIONS = 1000
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python power.py corpus|graph.npz")
+    graph = load(sys.argv[1])
+    ranks = graph.ranks_to_dict(power_iteration(graph, DAMPING))
+    print("PageRank Results from Power Iteration")
+    for page in sorted(ranks):
+        print(f"  {page}: {ranks[page]:.4f}")
+
+
+def iterate_pagerank(corpus, damping_factor, tolerance=TOLERANCE):
+    """
+    Return PageRank values for each page by power iteration on a
+    sparse transition matrix, until the L1 change between two
+    iterations is below `tolerance`.
+
+    Same interface as `pagerank.iterate_pagerank`, but a page with no
+    links is treated as linking to every page in the corpus.
+    """
+    graph = LinkGraph.from_corpus(corpus)
+    ranks = power_iteration(graph, damping_factor, tolerance)
+    return graph.ranks_to_dict(ranks)
+
+
+def step(graph, ranks, damping_factor, teleport=None):
+    """
+    Return the rank vector after one step of the random surfer
+    starting from the rank vector `ranks`.
+
+    With probability `damping_factor` the surfer follows a random link
+    of the current page, or, if there is none, jumps according to
+    `teleport`. Otherwise it jumps according to `teleport`, which
+    defaults to the uniform distribution over all pages.
+
+    `ranks` and `teleport` may also be N x K matrices, to step K
+    independent surfers with a column each.
+    """
+    dangling = ranks[graph.dangling].sum(axis=0)
+    new_ranks = damping_factor * (graph.transition() @ ranks)
+    jump = (1 - damping_factor) + damping_factor * dangling
+    if teleport is None:
+        new_ranks += jump / graph.N
+    else:
+        new_ranks += jump * teleport
+    return new_ranks
+
+
+def power_iteration(graph, damping_factor, tolerance=TOLERANCE,
+                    max_iterations=MAX_ITERATIONS, start=None, teleport=None,
+                    log=False):
+    """
+    Return the PageRank vector of `graph` by power iteration.
+
+    Iteration starts from `start`, or the uniform distribution, and stops
+    when the L1 change between two iterations is below `tolerance` or
+    after `max_iterations` iterations.
+
+    With an N x K `teleport` matrix, K rank vectors are computed at once
+    as the columns of the result, until all of them have converged.
+    """
+    if start is not None:
+        ranks = np.asarray(start, dtype=float)
+        ranks = ranks / ranks.sum(axis=0)
+    elif teleport is not None:
+        ranks = np.asarray(teleport, dtype=float).copy()
+    else:
+        ranks = np.full(graph.N, 1 / graph.N)
+
+    for i in range(max_iterations):
+        new_ranks = step(graph, ranks, damping_factor, teleport)
+        residual = np.abs(new_ranks - ranks).sum(axis=0).max()
+        ranks = new_ranks
+        if residual < tolerance:
+            break
+
+    if log:
+        print(f"Power iteration: {i + 1} iterations, residual {residual:.2e}")
+    return ranks
+
+
+if __name__ == "__main__":
+    main()
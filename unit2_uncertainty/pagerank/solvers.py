@@ -0,0 +1,161 @@
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import scipy.sparse as sp
+
+from scipy.sparse.linalg import spsolve_triangular
+
+from crawler import load
+from pagerank import DAMPING
+from power import MAX_ITERATIONS, TOLERANCE, step
+
+# Power iterations between two Aitken extrapolations
+EXTRAPOLATE_EVERY = 10
+
+
+def main():
+    if len(sys.argv) not in [2, 3] or (
+            len(sys.argv) == 3 and sys.argv[2] not in SOLVERS):
+        sys.exit("Usage: python solvers.py corpus|graph.npz "
+                 f"[{'|'.join(SOLVERS)}]")
+    graph = load(sys.argv[1])
+    method = sys.argv[2] if len(sys.argv) == 3 else "power"
+
+    ranks, trace = solve(graph, DAMPING, method)
+    print(f"PageRank Results from {method} "
+          f"({trace['iterations']} iterations, {trace['time']:.4f}s, "
+          f"{trace['memory'] / 1024:.0f} KiB)")
+    ranks = graph.ranks_to_dict(ranks)
+    for page in sorted(ranks):
+        print(f"  {page}: {ranks[page]:.4f}")
+
+
+def solve(graph, damping_factor, method="power", tolerance=TOLERANCE,
+          max_iterations=MAX_ITERATIONS, memory=True):
+    """
+    Return the PageRank vector of `graph` computed with the solver named
+    `method`, along with a trace dictionary of:
+        - "iterations": number of iterations run
+        - "residuals": L1 change of the rank vector at every iteration
+        - "time": wall time in seconds
+        - "memory": peak memory allocated while solving, in bytes, or
+          None if `memory` is False
+
+    Tracing allocations slows the solver down, so the time comes from
+    an untraced run and the peak memory from a second, traced run. The
+    transition matrix is built beforehand, so neither counts it.
+    """
+    solver = SOLVERS[method]
+    graph.transition()
+
+    residuals = []
+    start = time.perf_counter()
+    ranks = solver(graph, damping_factor, tolerance, max_iterations,
+                   residuals)
+    elapsed = time.perf_counter() - start
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            solver(graph, damping_factor, tolerance, max_iterations, [])
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return ranks, {
+        "iterations": len(residuals),
+        "residuals": residuals,
+        "time": elapsed,
+        "memory": peak
+    }
+
+
+def power(graph, damping_factor, tolerance, max_iterations, residuals):
+    """
+    Plain power iteration, appending the L1 residual of every
+    iteration to `residuals`.
+    """
+    ranks = np.full(graph.N, 1 / graph.N)
+    for i in range(max_iterations):
+        new_ranks = step(graph, ranks, damping_factor)
+        residuals.append(float(np.abs(new_ranks - ranks).sum()))
+        ranks = new_ranks
+        if residuals[-1] < tolerance:
+            break
+    return ranks
+
+
+def aitken(graph, damping_factor, tolerance, max_iterations, residuals,
+           every=EXTRAPOLATE_EVERY):
+    """
+    Power iteration with Aitken extrapolation: every `every` iterations,
+    the last three iterates x0, x1, x2 are replaced componentwise by
+    x2 - (x2 - x1)^2 / (x2 - 2 x1 + x0), which removes the error along
+    the second eigenvector.
+    """
+    ranks = np.full(graph.N, 1 / graph.N)
+    history = []
+    for i in range(max_iterations):
+        new_ranks = step(graph, ranks, damping_factor)
+        residuals.append(float(np.abs(new_ranks - ranks).sum()))
+        ranks = new_ranks
+        if residuals[-1] < tolerance:
+            break
+
+        history = history[-2:] + [ranks]
+        if (i + 1) % every == 0 and len(history) == 3:
+            x0, x1, x2 = history
+            g = (x2 - x1) ** 2
+            h = x2 - 2 * x1 + x0
+            safe = np.abs(h) > 1e-15
+            ranks = x2.copy()
+            ranks[safe] -= g[safe] / h[safe]
+
+            # Extrapolation can overshoot, keep a valid distribution
+            np.maximum(ranks, 0, out=ranks)
+            ranks /= ranks.sum()
+            history = []
+
+    return ranks
+
+
+def gauss_seidel(graph, damping_factor, tolerance, max_iterations,
+                 residuals):
+    """
+    Gauss-Seidel iteration on the linear system (I - d M) y = 1 / N,
+    whose solution normalized to sum to 1 is the PageRank vector with
+    dangling pages linking to every page.
+
+    Every sweep solves a sparse triangular system, so each page's update
+    already uses the new values of the pages numbered before it.
+    """
+    N = graph.N
+    M = damping_factor * graph.transition()
+    lower = sp.identity(N, format="csr") - sp.tril(M, k=-1, format="csr")
+    upper = sp.triu(M, k=1, format="csr")
+    v = np.full(N, 1 / N)
+
+    y = v.copy()
+    ranks = y / y.sum()
+    for i in range(max_iterations):
+        y = spsolve_triangular(lower, v + upper @ y, lower=True)
+        new_ranks = y / y.sum()
+        residuals.append(float(np.abs(new_ranks - ranks).sum()))
+        ranks = new_ranks
+        if residuals[-1] < tolerance:
+            break
+    return ranks
+
+
+SOLVERS = {
+    "power": power,
+    "aitken": aitken,
+    "gauss-seidel": gauss_seidel
+}
+
+
+if __name__ == "__main__":
+    main()
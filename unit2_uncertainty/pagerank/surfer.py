@@ -0,0 +1,153 @@
+import sys
+
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor
+
+from crawler import load
+from graph import LinkGraph
+from pagerank import DAMPING, SAMPLES
+
+# Number of surfers moved together in every process
+WALKERS = 1024
+
+# Steps each surfer takes before its visits are counted
+BURN_IN = 100
+
+
+def main():
+    if len(sys.argv) not in [2, 3]:
+        sys.exit("Usage: python surfer.py corpus|graph.npz [samples]")
+    graph = load(sys.argv[1])
+    n = int(sys.argv[2]) if len(sys.argv) == 3 else SAMPLES
+    counts = sample_counts(graph, DAMPING, n)
+    ranks = graph.ranks_to_dict(counts / counts.sum())
+    print(f"PageRank Results from Sampling (n = {n})")
+    for page in sorted(ranks):
+        print(f"  {page}: {ranks[page]:.4f}")
+
+
+def sample_pagerank(corpus, damping_factor, n, processes=1, seed=None):
+    """
+    Return PageRank values for each page by sampling `n` pages
+    with random surfers, spread across `processes` processes.
+
+    Same interface as `pagerank.sample_pagerank`.
+    """
+    graph = LinkGraph.from_corpus(corpus)
+    counts = sample_counts(graph, damping_factor, n, processes, seed)
+    return graph.ranks_to_dict(counts / counts.sum())
+
+
+def walk(graph, damping_factor, n, walkers=WALKERS, seed=None,
+         burn_in=BURN_IN):
+    """
+    Move `walkers` random surfers over `graph` together until `n` pages
+    have been visited in total, and return how many times each page
+    was visited.
+
+    Surfers start on pages chosen at random, so the first `burn_in`
+    steps of each are not counted: after k steps the bias from the
+    start is at most `damping_factor` ** k. The number of surfers is
+    capped so that burn-in costs at most as many steps as the visits.
+
+    Every step costs O(1) per surfer: with probability `damping_factor`
+    a surfer follows a link of its page chosen uniformly at random, which
+    is a single lookup in the CSR link arrays. Otherwise, or if its page
+    has no links, it jumps to a page chosen uniformly at random.
+    """
+    rng = np.random.default_rng(seed)
+    walkers = max(1, min(walkers, n // max(burn_in, 1)))
+    N = graph.N
+
+    # Visits are buffered and counted with one `bincount` per chunk
+    chunk = max(N, 1 << 20) // walkers * walkers
+    buffer = np.empty(chunk, dtype=np.int64)
+    filled = 0
+    counts = np.zeros(N, dtype=np.int64)
+
+    # Start every surfer on a page at random
+    pages = rng.integers(N, size=walkers)
+    visited = -burn_in * walkers
+
+    while visited < n:
+        size = min(walkers, n - visited)
+
+        # Record the current page of each surfer, once burnt in
+        if visited >= 0:
+            if filled + size > chunk:
+                counts += np.bincount(buffer[:filled], minlength=N)
+                filled = 0
+            buffer[filled:filled + size] = pages[:size]
+            filled += size
+        visited += size
+
+        # Decide which surfers follow a link, and which jump
+        degree = graph.out_degree[pages]
+        follow = (rng.random(walkers) < damping_factor) & (degree > 0)
+
+        # Follow a link chosen uniformly among the page's links
+        offsets = (rng.random(walkers) * degree).astype(np.int64)
+        links = graph.indices[graph.indptr[pages[follow]] + offsets[follow]]
+
+        # Jump to a page chosen uniformly among all pages
+        pages = rng.integers(N, size=walkers)
+        pages[follow] = links
+
+    counts += np.bincount(buffer[:filled], minlength=N)
+    return counts
+
+
+def _walk(args):
+    """
+    Unpack arguments for `walk` so it can be used with `map`.
+    """
+    return walk(*args)
+
+
+def sample_counts(graph, damping_factor, n, processes=1, seed=None,
+                  walkers=WALKERS):
+    """
+    Return how many times each page of `graph` was visited by random
+    surfers, with `n` visits split evenly across `processes` processes
+    running independent surfers.
+
+    Each process gets its own random stream spawned from `seed`, so
+    results are reproducible for a given `seed` and `processes`.
+    """
+    seeds = np.random.SeedSequence(seed).spawn(processes)
+    shares = [n // processes + (k < n % processes) for k in range(processes)]
+    tasks = [
+        (graph, damping_factor, share, walkers, seeds[k])
+        for k, share in enumerate(shares) if share
+    ]
+
+    if processes == 1:
+        return sum(map(_walk, tasks))
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return sum(executor.map(_walk, tasks))
+
+
+def sample_error(graph, damping_factor, n, batches=10, processes=1,
+                 seed=None):
+    """
+    Estimate PageRank by sampling `n` pages split into `batches`
+    independent batches, and return the estimate along with the
+    standard error of every page's value, from the spread between
+    batch estimates.
+    """
+    seeds = np.random.SeedSequence(seed).generate_state(batches)
+    estimates = np.array([
+        sample_counts(graph, damping_factor, n // batches, processes, int(s))
+        for s in seeds
+    ], dtype=float)
+    estimates /= estimates.sum(axis=1, keepdims=True)
+
+    ranks = estimates.mean(axis=0)
+    error = estimates.std(axis=0, ddof=1) / np.sqrt(batches)
+    return ranks, error
+
+
+if __name__ == "__main__":
+    main()
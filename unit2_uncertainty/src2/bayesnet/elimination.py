@@ -0,0 +1,129 @@
+import string
+
+import numpy as np
+
+from network import Network
+
+# Contraction orders found so far, by subscripts and shapes of the
+# network's factors, so that different networks never share an order
+_paths = {}
+
+
+def probability(network, observations):
+    """
+    Return the joint probability of every observation in `observations`,
+    each a list with one value per variable in topological order,
+    like pomegranate's `BayesianNetwork.probability`.
+    """
+    codes = np.array([
+        [network.codes[v][value] for v, value in enumerate(observation)]
+        for observation in observations
+    ], dtype=np.int64).reshape(-1, len(network.names))
+
+    p = np.ones(len(codes))
+    for v, cpt in enumerate(network.cpts):
+        p *= cpt[tuple(codes[:, u] for u in network.parents[v] + [v])]
+    return p
+
+
+def posterior(network, query, evidences):
+    """
+    Return the distribution of variable `query` given each evidence in
+    `evidences`, a list of dictionaries of variable name to value, as an
+    array with one row per evidence.
+
+    Evidences observing the same variables are answered together by a
+    single sum of products over all factors of the network, with the
+    evidence as a batch axis. NumPy picks the order in which variables
+    are eliminated, and that order is cached for later queries.
+    """
+    q = network.index[query]
+    results = np.zeros((len(evidences), len(network.values[q])))
+
+    # Group evidences by the variables they observe
+    groups = {}
+    for i, evidence in enumerate(evidences):
+        key = tuple(sorted(network.index[name] for name in evidence))
+        groups.setdefault(key, []).append(i)
+
+    for observed, rows in groups.items():
+        batch = len(rows)
+
+        # One-hot indicator of the observed value, per evidence
+        indicators = []
+        for v in observed:
+            indicator = np.zeros((batch, len(network.values[v])))
+            name = network.names[v]
+            codes = [network.codes[v][evidences[i][name]] for i in rows]
+            indicator[np.arange(batch), codes] = 1
+            indicators.append(indicator)
+
+        subscripts = expression(network, q, observed)
+        operands = network.cpts + indicators + [np.ones(batch)]
+        key = (subscripts, tuple(cpt.shape for cpt in network.cpts))
+        if key not in _paths:
+            _paths[key] = np.einsum_path(
+                subscripts, *operands, optimize="greedy"
+            )[0]
+        table = np.einsum(subscripts, *operands, optimize=_paths[key])
+
+        totals = table.sum(axis=1, keepdims=True)
+        results[rows] = np.divide(
+            table, totals, out=np.zeros_like(table), where=totals > 0
+        )
+
+    return results
+
+
+def expression(network, query, observed):
+    """
+    Return the `einsum` subscripts multiplying every factor of `network`
+    with indicators for the `observed` variables, summing out everything
+    except the batch axis and the `query` variable.
+    """
+    letters = string.ascii_letters
+    batch = letters[-1]
+    terms = [
+        "".join(letters[u] for u in network.parents[v] + [v])
+        for v in range(len(network.names))
+    ]
+    terms += [batch + letters[v] for v in observed]
+    terms.append(batch)
+    return ",".join(terms) + "->" + batch + letters[query]
+
+
+def predict_proba(network, evidences):
+    """
+    Return, for each evidence in `evidences`, a list with an entry per
+    variable like pomegranate's `BayesianNetwork.predict_proba`: the
+    observed value for observed variables, otherwise a dictionary of
+    value to probability.
+    """
+    results = [[] for evidence in evidences]
+    for name in network.names:
+        distributions = posterior(network, name, evidences)
+        for i, evidence in enumerate(evidences):
+            if name in evidence:
+                results[i].append(evidence[name])
+            else:
+                results[i].append(network.decode(name, distributions[i]))
+    return results
+
+
+if __name__ == "__main__":
+    network = Network()
+
+    # Calculate predictions
+    predictions = predict_proba(network, [{"train": "delayed"}])[0]
+
+    # Print predictions for each node
+    for name, prediction in zip(network.names, predictions):
+        if isinstance(prediction, str):
+            print(f"{name}: {prediction}")
+        else:
+            print(f"{name}")
+            for value, p in prediction.items():
+                print(f"    {value}: {p:.4f}")
+
+    # Calculate probability for a given observation
+    print(probability(network, [["none", "no", "on time", "attend"]])[0])
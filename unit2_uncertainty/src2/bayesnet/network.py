@@ -0,0 +1,120 @@
+import numpy as np
+
+# Rain node has no parents
+RAIN = {
+    "none": 0.7,
+    "light": 0.2,
+    "heavy": 0.1
+}
+
+# Track maintenance node is conditional on rain
+MAINTENANCE = [
+    ["none", "yes", 0.4],
+    ["none", "no", 0.6],
+    ["light", "yes", 0.2],
+    ["light", "no", 0.8],
+    ["heavy", "yes", 0.1],
+    ["heavy", "no", 0.9]
+]
+
+# Train node is conditional on rain and maintenance
+TRAIN = [
+    ["none", "yes", "on time", 0.8],
+    ["none", "yes", "delayed", 0.2],
+    ["none", "no", "on time", 0.9],
+    ["none", "no", "delayed", 0.1],
+    ["light", "yes", "on time", 0.6],
+    ["light", "yes", "delayed", 0.4],
+    ["light", "no", "on time", 0.7],
+    ["light", "no", "delayed", 0.3],
+    ["heavy", "yes", "on time", 0.4],
+    ["heavy", "yes", "delayed", 0.6],
+    ["heavy", "no", "on time", 0.5],
+    ["heavy", "no", "delayed", 0.5],
+]
+
+# Appointment node is conditional on train
+APPOINTMENT = [
+    ["on time", "attend", 0.9],
+    ["on time", "miss", 0.1],
+    ["delayed", "attend", 0.6],
+    ["delayed", "miss", 0.4]
+]
+
+# Nodes in topological order, as (name, parent names, distribution)
+NODES = [
+    ("rain", [], RAIN),
+    ("maintenance", ["rain"], MAINTENANCE),
+    ("train", ["rain", "maintenance"], TRAIN),
+    ("appointment", ["train"], APPOINTMENT)
+]
+
+
+class Network():
+    """
+    Discrete Bayesian network compiled into integer-coded arrays.
+
+    Values of every variable are numbered in order of first appearance,
+    and the distribution of variable `v` is an array `cpts[v]` with one
+    axis per parent, in order, and a last axis over the values of `v`.
+    """
+
+    def __init__(self, nodes=NODES):
+
+        self.names = [name for name, _, _ in nodes]
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.parents = [
+            [self.index[parent] for parent in parents]
+            for _, parents, _ in nodes
+        ]
+
+        # Number values of each variable, in order of first appearance
+        self.values = []
+        for name, parents, distribution in nodes:
+            if isinstance(distribution, dict):
+                values = list(distribution)
+            else:
+                values = list(dict.fromkeys(row[-2] for row in distribution))
+            self.values.append(values)
+        self.codes = [
+            {value: i for i, value in enumerate(values)}
+            for values in self.values
+        ]
+
+        # Fill in probability tables
+        self.cpts = []
+        for v, (name, parents, distribution) in enumerate(nodes):
+            shape = [len(self.values[p]) for p in self.parents[v]]
+            cpt = np.zeros(shape + [len(self.values[v])])
+            if isinstance(distribution, dict):
+                for value, p in distribution.items():
+                    cpt[self.codes[v][value]] = p
+            else:
+                for row in distribution:
+                    key = tuple(
+                        self.codes[p][value]
+                        for p, value in zip(self.parents[v], row[:-2])
+                    )
+                    cpt[key + (self.codes[v][row[-2]],)] = row[-1]
+            self.cpts.append(cpt)
+
+    def encode(self, assignment):
+        """
+        Return a dictionary of variable name to value as a dictionary
+        of variable id to value code.
+        """
+        return {
+            self.index[name]: self.codes[self.index[name]][value]
+            for name, value in assignment.items()
+        }
+
+    def decode(self, variable, distribution):
+        """
+        Return an array of probabilities over the values of `variable`
+        as a dictionary of value to probability.
+        """
+        v = self.index[variable]
+        return {
+            value: float(distribution[i])
+            for i, value in enumerate(self.values[v])
+        }
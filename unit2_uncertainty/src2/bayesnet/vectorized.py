@@ -0,0 +1,112 @@
+import numpy as np
+
+from network import Network
+
+# Number of samples drawn at once
+CHUNK_SIZE = 1 << 20
+
+
+def generate_samples(network, n, rng, evidence=None):
+    """
+    Generate `n` samples from `network` at once, and return them as an
+    integer array of value codes with one row per sample and one column
+    per variable.
+
+    Variables in `evidence`, a dictionary of variable id to value code,
+    are fixed instead of sampled.
+    """
+    evidence = evidence or {}
+    samples = np.empty((n, len(network.names)), dtype=np.int64)
+
+    # Loop over all variables, in topological order
+    for v, cpt in enumerate(network.cpts):
+        if v in evidence:
+            samples[:, v] = evidence[v]
+            continue
+
+        # Look up the distribution given each sample's parents
+        cdf = np.cumsum(cpt, axis=-1)
+        if network.parents[v]:
+            cdf = cdf[tuple(samples[:, p] for p in network.parents[v])]
+
+        u = rng.random(n)[:, None]
+        samples[:, v] = np.minimum((u > cdf).sum(axis=-1), cpt.shape[-1] - 1)
+
+    return samples
+
+
+def rejection_sampling(network, query, evidence, n, seed=None):
+    """
+    Estimate the distribution of variable `query` given `evidence`,
+    a dictionary of variable name to value, by drawing `n` samples and
+    keeping those that agree with the evidence.
+
+    Return the distribution as a dictionary of value to probability,
+    and the number of samples kept.
+    """
+    rng = np.random.default_rng(seed)
+    q = network.index[query]
+    evidence = network.encode(evidence)
+
+    counts = np.zeros(len(network.values[q]))
+    for start in range(0, n, CHUNK_SIZE):
+        samples = generate_samples(network, min(CHUNK_SIZE, n - start), rng)
+        keep = np.ones(len(samples), dtype=bool)
+        for v, code in evidence.items():
+            keep &= samples[:, v] == code
+        counts += np.bincount(samples[keep, q], minlength=len(counts))
+
+    kept = int(counts.sum())
+    if kept:
+        counts /= kept
+    return network.decode(query, counts), kept
+
+
+def likelihood_weighting(network, query, evidence, n, seed=None):
+    """
+    Estimate the distribution of variable `query` given `evidence`,
+    a dictionary of variable name to value, from `n` samples with the
+    evidence fixed, each weighted by the probability of the evidence
+    given its parents.
+
+    Return the distribution as a dictionary of value to probability.
+    """
+    rng = np.random.default_rng(seed)
+    q = network.index[query]
+    evidence = network.encode(evidence)
+
+    weights = np.zeros(len(network.values[q]))
+    for start in range(0, n, CHUNK_SIZE):
+        size = min(CHUNK_SIZE, n - start)
+        samples = generate_samples(network, size, rng, evidence)
+
+        w = np.ones(size)
+        for v, code in evidence.items():
+            cpt = network.cpts[v][..., code]
+            if network.parents[v]:
+                w *= cpt[tuple(samples[:, p] for p in network.parents[v])]
+            else:
+                w *= cpt
+        weights += np.bincount(samples[:, q], w, minlength=len(weights))
+
+    return network.decode(query, weights / weights.sum())
+
+
+if __name__ == "__main__":
+
+    # Compute distribution of Appointment given that train is delayed
+    network = Network()
+    N = 1000000
+    distribution, kept = rejection_sampling(
+        network, "appointment", {"train": "delayed"}, N
+    )
+    print(f"Rejection sampling ({kept} of {N} samples kept)")
+    for value, p in distribution.items():
+        print(f"    {value}: {p:.4f}")
+
+    distribution = likelihood_weighting(
+        network, "appointment", {"train": "delayed"}, N
+    )
+    print("Likelihood weighting")
+    for value, p in distribution.items():
+        print(f"    {value}: {p:.4f}")
@@ -0,0 +1,193 @@
+from bisect import bisect_right
+
+import numpy as np
+
+# Define starting probabilities
+START = {
+    "sun": 0.5,
+    "rain": 0.5
+}
+
+# Define transition model
+TRANSITIONS = [
+    ["sun", "sun", 0.8],
+    ["sun", "rain", 0.2],
+    ["rain", "sun", 0.3],
+    ["rain", "rain", 0.7]
+]
+
+# Number of steps of a single chain sampled at once, divided by the
+# number of states each block is followed from
+CHUNK_SIZE = 1 << 20
+
+# Most states for which blocks are followed from every state; chains
+# with more states are sampled one step at a time
+BLOCK_STATES = 8
+
+
+class MarkovChain():
+    """
+    Markov chain over a finite set of states, sampled with NumPy.
+
+    States are numbered in the order of the starting distribution, and
+    `matrix[i, j]` is the probability of moving from state i to state j.
+    """
+
+    def __init__(self, start=START, transitions=TRANSITIONS):
+
+        self.states = list(start)
+        self.index = {state: i for i, state in enumerate(self.states)}
+        S = len(self.states)
+
+        self.start = np.array([start[state] for state in self.states])
+        self.matrix = np.zeros((S, S))
+        for before, after, p in transitions:
+            self.matrix[self.index[before], self.index[after]] = p
+
+        # Cumulative tables, to draw a state with one search
+        self.start_cdf = np.cumsum(self.start)
+        self.cdf = np.cumsum(self.matrix, axis=1)
+
+        # Smallest integer type that holds every state
+        self.dtype = np.min_scalar_type(max(S - 1, 0))
+
+    def decode(self, codes):
+        """
+        Return an array of state numbers as a list of state names.
+        """
+        return [self.states[code] for code in codes]
+
+    def draw(self, cdf, u):
+        """
+        Return the states drawn with uniform numbers `u` from the
+        cumulative distribution `cdf`.
+        """
+        return np.minimum(
+            np.searchsorted(cdf, u, side="right"), len(self.states) - 1
+        ).astype(self.dtype)
+
+    def sample_chains(self, chains, steps, seed=None):
+        """
+        Sample `chains` independent chains of `steps` states each, moving
+        all chains together, and return an array with one row per chain.
+        """
+        rng = np.random.default_rng(seed)
+        samples = np.empty((chains, steps), dtype=self.dtype)
+        if steps == 0:
+            return samples
+
+        samples[:, 0] = self.draw(self.start_cdf, rng.random(chains))
+        for t in range(1, steps):
+            cdf = self.cdf[samples[:, t - 1]]
+            u = rng.random(chains)[:, None]
+            samples[:, t] = np.minimum(
+                (u >= cdf).sum(axis=1), len(self.states) - 1
+            )
+        return samples
+
+    def sample(self, n, seed=None):
+        """
+        Sample a single chain of `n` states and return it as an array.
+
+        Steps are sampled a chunk at a time, with the chunk cut into
+        blocks. The path through each block is followed from every
+        possible starting state at once, moving all blocks together,
+        then each block's actual starting state is read off the end of
+        the block before it. That takes about 2 * sqrt(chunk) Python
+        iterations per chunk instead of one per step, but S times the
+        work and memory for S states, so chains with more than
+        `BLOCK_STATES` states are sampled by `sample_steps` instead.
+        """
+        rng = np.random.default_rng(seed)
+        samples = np.empty(n, dtype=self.dtype)
+        if n == 0:
+            return samples
+        S = len(self.states)
+
+        state = self.draw(self.start_cdf, rng.random())
+        samples[0] = state
+        if S > BLOCK_STATES:
+            return self.sample_steps(samples, rng)
+
+        done = 1
+        while done < n:
+            size = min(CHUNK_SIZE // S, n - done)
+            length = max(1, int(np.sqrt(size)))
+            blocks = -(-size // length)
+
+            # Where each step goes from every state: maps[b, j, s]
+            u = rng.random((blocks, length))
+            maps = np.empty((blocks, length, S), dtype=self.dtype)
+            for s in range(S):
+                maps[:, :, s] = self.draw(self.cdf[s], u)
+
+            # Follow every block from every starting state
+            paths = np.empty_like(maps)
+            paths[:, 0] = maps[:, 0]
+            for j in range(1, length):
+                paths[:, j] = np.take_along_axis(
+                    maps[:, j], paths[:, j - 1], axis=1
+                )
+
+            # Chain blocks together from the current state
+            starts = np.empty(blocks, dtype=np.int64)
+            ends = paths[:, -1]
+            for b in range(blocks):
+                starts[b] = state
+                state = ends[b, state]
+
+            chunk = paths[np.arange(blocks), :, starts].ravel()[:size]
+            samples[done:done + size] = chunk
+            state = chunk[-1]
+            done += size
+
+        return samples
+
+    def sample_steps(self, samples, rng):
+        """
+        Fill in `samples` after its first state one step at a time, each
+        step a binary search in the cumulative row of the current state,
+        and return it.
+        """
+        n = len(samples)
+        last = len(self.states) - 1
+        rows = self.cdf.tolist()
+        state = int(samples[0])
+        for done in range(1, n, CHUNK_SIZE):
+            size = min(CHUNK_SIZE, n - done)
+            chunk = []
+            for u in rng.random(size).tolist():
+                state = min(bisect_right(rows[state], u), last)
+                chunk.append(state)
+            samples[done:done + size] = chunk
+        return samples
+
+    def k_step(self, k):
+        """
+        Return the matrix of probabilities of moving from each state to
+        each other state in exactly `k` steps.
+        """
+        return np.linalg.matrix_power(self.matrix, k)
+
+    def distribution(self, k):
+        """
+        Return the distribution of the state after `k` steps.
+        """
+        return self.start @ self.k_step(k)
+
+    def stationary(self):
+        """
+        Return the stationary distribution of the chain: the left
+        eigenvector of the transition matrix with eigenvalue 1,
+        normalized to sum to 1.
+        """
+        values, vectors = np.linalg.eig(self.matrix.T)
+        vector = np.real(vectors[:, np.argmin(np.abs(values - 1))])
+        return vector / vector.sum()
+
+
+if __name__ == "__main__":
+    model = MarkovChain()
+
+    # Sample 50 states from chain
+    print(model.decode(model.sample(50)))
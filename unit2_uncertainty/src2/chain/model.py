@@ -1,18 +1,12 @@
 from pomegranate import *
 
+from engine import START, TRANSITIONS
+
 # Define starting probabilities
-start = DiscreteDistribution({
-    "sun": 0.5,
-    "rain": 0.5
-})
+start = DiscreteDistribution(START)
 
 # Define transition model
-transitions = ConditionalProbabilityTable([
-    ["sun", "sun", 0.8],
-    ["sun", "rain", 0.2],
-    ["rain", "sun", 0.3],
-    ["rain", "rain", 0.7]
-], [start])
+transitions = ConditionalProbabilityTable(TRANSITIONS, [start])
 
 # Create Markov chain
 model = MarkovChain([start, transitions])
@@ -0,0 +1,252 @@
+import numpy as np
+
+# Observation model for each state
+SUN = {
+    "umbrella": 0.2,
+    "no umbrella": 0.8
+}
+
+RAIN = {
+    "umbrella": 0.9,
+    "no umbrella": 0.1
+}
+
+STATES = ["sun", "rain"]
+EMISSIONS = [SUN, RAIN]
+
+# Transition model
+TRANSITIONS = [
+    [0.8, 0.2],  # Tomorrow's predictions if today = sun
+    [0.3, 0.7]   # Tomorrow's predictions if today = rain
+]
+
+# Starting probabilities
+STARTS = [0.5, 0.5]
+
+
+def logsumexp(a, axis):
+    """
+    Return log(sum(exp(a))) along `axis`, without overflow or underflow.
+    """
+    peak = np.max(a, axis=axis, keepdims=True)
+    peak = np.where(np.isfinite(peak), peak, 0)
+    total = np.log(np.sum(np.exp(a - peak), axis=axis, keepdims=True))
+    return np.squeeze(total + peak, axis=axis)
+
+
+class HMM():
+    """
+    Hidden Markov model decoding many observation sequences at once.
+
+    Sequences are given as a list of lists of observations, of any
+    lengths. Internally they become a padded array of observation codes
+    with one row per sequence, and an array of sequence lengths.
+    """
+
+    def __init__(self, starts=STARTS, transitions=TRANSITIONS,
+                 emissions=EMISSIONS, states=STATES):
+
+        self.states = list(states)
+        self.observations = list(dict.fromkeys(
+            observation for emission in emissions for observation in emission
+        ))
+        self.codes = {
+            observation: i for i, observation in enumerate(self.observations)
+        }
+
+        # Probabilities, and their logarithms for decoding
+        self.starts = np.asarray(starts, dtype=float)
+        self.transitions = np.asarray(transitions, dtype=float)
+        self.emissions = np.array([
+            [emission.get(observation, 0) for observation in self.observations]
+            for emission in emissions
+        ])
+        with np.errstate(divide="ignore"):
+            self.log_starts = np.log(self.starts)
+            self.log_transitions = np.log(self.transitions)
+            self.log_emissions = np.log(self.emissions)
+
+    def encode(self, sequences):
+        """
+        Return `sequences` as a padded array of observation codes,
+        padded with 0, and an array of sequence lengths.
+        """
+        lengths = np.array([len(sequence) for sequence in sequences])
+        codes = np.zeros((len(sequences), max(lengths, default=0)),
+                         dtype=np.int64)
+        for i, sequence in enumerate(sequences):
+            codes[i, :len(sequence)] = [self.codes[o] for o in sequence]
+        return codes, lengths
+
+    def predict(self, sequences, algorithm="map"):
+        """
+        Return the predicted sequence of states for every sequence of
+        observations, as lists of state names, like pomegranate's
+        `HiddenMarkovModel.predict`: "map" picks the most likely state
+        at each step, "viterbi" the most likely sequence of states.
+        """
+        if algorithm == "viterbi":
+            return self.viterbi(sequences)
+        posteriors, _ = self.forward_backward(sequences)
+        return [
+            [self.states[s] for s in posterior.argmax(axis=1)]
+            for posterior in posteriors
+        ]
+
+    def viterbi(self, sequences):
+        """
+        Return the most likely sequence of states for every sequence
+        of observations, as lists of state names.
+        """
+        codes, lengths = self.encode(sequences)
+        paths = self.viterbi_codes(codes, lengths)
+        return [
+            [self.states[s] for s in path[:length]]
+            for path, length in zip(paths, lengths)
+        ]
+
+    def viterbi_codes(self, codes, lengths):
+        """
+        Return the most likely state of every step of every sequence in
+        the padded array `codes`, computed in log space for all sequences
+        together. Steps past the end of a sequence are -1.
+        """
+        batch, steps = codes.shape
+        S = len(self.states)
+        if steps == 0:
+            return np.zeros((batch, 0), dtype=np.int64)
+
+        # Best log probability of a path ending in each state
+        scores = self.log_starts + self.log_emissions[:, codes[:, 0]].T
+        pointers = np.empty((batch, steps, S), dtype=np.int64)
+        pointers[:, 0] = np.arange(S)
+
+        for t in range(1, steps):
+            candidates = scores[:, :, None] + self.log_transitions
+            best = candidates.argmax(axis=1)
+            new_scores = np.take_along_axis(candidates, best[:, None], 1)
+            new_scores = (new_scores[:, 0]
+                          + self.log_emissions[:, codes[:, t]].T)
+
+            # Sequences that have ended keep their scores and states
+            active = t < lengths
+            scores = np.where(active[:, None], new_scores, scores)
+            pointers[:, t] = np.where(active[:, None], best, np.arange(S))
+
+        # Follow pointers back from the best final state
+        paths = np.empty((batch, steps), dtype=np.int64)
+        paths[:, -1] = scores.argmax(axis=1)
+        rows = np.arange(batch)
+        for t in range(steps - 1, 0, -1):
+            paths[:, t - 1] = pointers[rows, t, paths[:, t]]
+
+        paths[np.arange(steps) >= lengths[:, None]] = -1
+        return paths
+
+    def forward_backward(self, sequences):
+        """
+        Return, for every sequence of observations, the probability of
+        each state at each step given the whole sequence, as an array
+        with one row per step and one column per state, along with the
+        log likelihood of every sequence.
+        """
+        codes, lengths = self.encode(sequences)
+        posteriors, likelihoods = self.forward_backward_codes(codes, lengths)
+        return [
+            posterior[:length]
+            for posterior, length in zip(posteriors, lengths)
+        ], likelihoods
+
+    def forward_backward_codes(self, codes, lengths):
+        """
+        Run the forward-backward algorithm in log space over all
+        sequences of the padded array `codes` together.
+
+        Return an array of state probabilities for every sequence and
+        step, zero past the end of a sequence, and the log likelihood
+        of every sequence.
+        """
+        batch, steps = codes.shape
+        S = len(self.states)
+        if steps == 0:
+            return np.zeros((batch, 0, S)), np.zeros(batch)
+        emissions = self.log_emissions[:, codes].transpose(1, 2, 0)
+        active = np.arange(steps) < lengths[:, None]
+
+        # Forward: log probability of observations so far and state
+        forward = np.empty((batch, steps, S))
+        forward[:, 0] = self.log_starts + emissions[:, 0]
+        for t in range(1, steps):
+            forward[:, t] = logsumexp(
+                forward[:, t - 1, :, None] + self.log_transitions, axis=1
+            ) + emissions[:, t]
+            forward[:, t] = np.where(
+                active[:, t, None], forward[:, t], forward[:, t - 1]
+            )
+
+        # Backward: log probability of the observations still to come
+        backward = np.zeros((batch, steps, S))
+        for t in range(steps - 2, -1, -1):
+            step = logsumexp(
+                self.log_transitions
+                + (emissions[:, t + 1] + backward[:, t + 1])[:, None, :],
+                axis=2
+            )
+            backward[:, t] = np.where(active[:, t + 1, None], step, 0)
+
+        likelihoods = logsumexp(forward[:, -1], axis=1)
+        posteriors = np.exp(forward + backward - likelihoods[:, None, None])
+        posteriors[~active] = 0
+        return posteriors, likelihoods
+
+    def filter(self):
+        """
+        Return a new `Filter` tracking the belief state of this model.
+        """
+        return Filter(self)
+
+
+class Filter():
+    """
+    Online filter over the states of an `HMM`, updated one observation
+    at a time in O(S^2) for S states.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.belief = None
+
+    def update(self, observation):
+        """
+        Update the belief state with a new observation, and return the
+        probability of every state given all observations so far.
+        """
+        code = self.model.codes[observation]
+        if self.belief is None:
+            belief = self.model.starts.copy()
+        else:
+            belief = self.belief @ self.model.transitions
+        belief *= self.model.emissions[:, code]
+        self.belief = belief / belief.sum()
+        return self.belief
+
+
+if __name__ == "__main__":
+    model = HMM()
+
+    # Observed data
+    observations = [
+        "umbrella",
+        "umbrella",
+        "no umbrella",
+        "umbrella",
+        "umbrella",
+        "umbrella",
+        "umbrella",
+        "no umbrella",
+        "no umbrella"
+    ]
+
+    # Predict underlying states
+    for prediction in model.predict([observations])[0]:
+        print(prediction)
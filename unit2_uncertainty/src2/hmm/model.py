@@ -1,26 +1,18 @@
 from pomegranate import *
 
-# Observation model for each state
-sun = DiscreteDistribution({
-    "umbrella": 0.2,
-    "no umbrella": 0.8
-})
+from engine import RAIN, STARTS, SUN, TRANSITIONS
 
-rain = DiscreteDistribution({
-    "umbrella": 0.9,
-    "no umbrella": 0.1
-})
+# Observation model for each state
+sun = DiscreteDistribution(SUN)
+rain = DiscreteDistribution(RAIN)
 
 states = [sun, rain]
 
 # Transition model
-transitions = numpy.array(
-    [[0.8, 0.2], # Tomorrow's predictions if today = sun
-     [0.3, 0.7]] # Tomorrow's predictions if today = rain
-)
+transitions = numpy.array(TRANSITIONS)
 
 # Starting probabilities
-starts = numpy.array([0.5, 0.5])
+starts = numpy.array(STARTS)
 
 # Create the model
 model = HiddenMarkovModel.from_matrix(
@@ -0,0 +1,207 @@
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+from crossword import *
+from generate import CrosswordCreator
+from bitset import BitsetCreator
+from portfolio import RESTART_BASE, RandomizedCreator
+
+# Structures and word lists in data/, as (structure, words)
+CASES = [(0, 0), (0, 2), (1, 1), (1, 2), (2, 2)]
+
+# Generated square grids as (size, fraction of blocked cells), and
+# generated dictionaries by number of words
+GRIDS = [(5, 0.2), (9, 0.2), (13, 0.18)]
+DICTIONARIES = [1000, 10000, 100000]
+
+# Word list whose letters and lengths generated words follow
+SOURCE = "data/words2.txt"
+
+ENGINES = {
+    "set": CrosswordCreator,
+    "bitset": BitsetCreator,
+    "restarts": lambda crossword: RandomizedCreator(
+        crossword, seed=SEED, restart=RESTART_BASE
+    )
+}
+
+# Seconds allowed for each run
+TIMEOUT = 60
+
+# Points kept of the trajectory of total domain size
+TRAJECTORY_POINTS = 100
+
+SEED = 0
+
+
+def main():
+
+    # Check usage
+    if len(sys.argv) not in [1, 2, 3]:
+        sys.exit("Usage: python benchmark.py [output.json] [timeout]")
+    output = sys.argv[1] if len(sys.argv) > 1 else None
+    timeout = float(sys.argv[2]) if len(sys.argv) > 2 else TIMEOUT
+
+    with tempfile.TemporaryDirectory() as directory:
+        cases = [
+            (f"data/structure{i}.txt", f"data/words{j}.txt")
+            for i, j in CASES
+        ]
+        cases += generated_cases(directory, SEED)
+
+        results = []
+        for structure, words in cases:
+            for engine in ENGINES:
+                result = benchmark(structure, words, engine, timeout)
+                print_result(result)
+                results.append(result)
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+
+def random_grid(size, blocked, rng):
+    """
+    Return the rows of a square crossword structure of `size` cells a
+    side, with about a fraction `blocked` of its cells blocked, placed
+    symmetrically under a half turn like a newspaper crossword.
+    """
+    grid = [["_"] * size for _ in range(size)]
+    cells = [(i, j) for i in range(size) for j in range(size)]
+    for i, j in rng.sample(cells, int(blocked * size * size / 2)):
+        grid[i][j] = "#"
+        grid[size - 1 - i][size - 1 - j] = "#"
+    return ["".join(row) for row in grid]
+
+
+def random_words(n, source, rng):
+    """
+    Return `n` distinct random words with the letter frequencies and
+    word lengths of the words in `source`.
+    """
+    letters = "".join(source)
+    lengths = [len(word) for word in source]
+    words = set()
+    while len(words) < n:
+        length = rng.choice(lengths)
+        words.add("".join(rng.choice(letters) for _ in range(length)))
+    return sorted(words)
+
+
+def generated_cases(directory, seed=None):
+    """
+    Write every generated grid and dictionary to files in `directory`,
+    and return every pair of them as (structure, words) file names.
+    """
+    rng = random.Random(seed)
+    with open(SOURCE) as f:
+        source = f.read().upper().split()
+
+    structures = []
+    for size, blocked in GRIDS:
+        path = os.path.join(directory, f"grid{size}.txt")
+        with open(path, "w") as f:
+            f.write("\n".join(random_grid(size, blocked, rng)) + "\n")
+        structures.append(path)
+
+    dictionaries = []
+    for n in DICTIONARIES:
+        path = os.path.join(directory, f"words{n}.txt")
+        with open(path, "w") as f:
+            f.write("\n".join(random_words(n, source, rng)) + "\n")
+        dictionaries.append(path)
+
+    return [
+        (structure, words)
+        for structure in structures for words in dictionaries
+    ]
+
+
+def trajectory(values, points=TRAJECTORY_POINTS):
+    """
+    Return at most `points` values evenly spaced through `values`,
+    including the first and the last.
+    """
+    if len(values) <= points:
+        return list(values)
+    step = (len(values) - 1) / (points - 1)
+    return [values[round(k * step)] for k in range(points)]
+
+
+def run(structure, words, engine):
+    """
+    Solve a crossword with one engine, and return its statistics.
+    """
+    start = time.perf_counter()
+    crossword = Crossword(structure, words)
+    load = time.perf_counter() - start
+
+    creator = ENGINES[engine](crossword)
+    creator.record_domains = True
+    assignment = creator.solve()
+    stats = creator.stats
+    return {
+        "solved": assignment is not None,
+        "variables": len(crossword.variables),
+        "words": len(crossword.words),
+        "nodes": stats["nodes"],
+        "backtracks": stats["backtracks"],
+        "revisions": stats["revisions"],
+        "pushes": stats["pushes"],
+        "restarts": getattr(creator, "runs", 1) - 1,
+        "times": {"load": load, **stats["times"]},
+        "domains": trajectory(stats["domains"])
+    }
+
+
+def benchmark(structure, words, engine, timeout=TIMEOUT):
+    """
+    Run `engine` on a crossword in a separate process, and return a
+    result dictionary with its statistics from `run`, the total "time",
+    and whether it ran out of time after `timeout` seconds.
+    """
+    result = {
+        "structure": os.path.basename(structure),
+        "words_file": os.path.basename(words),
+        "engine": engine
+    }
+    start = time.perf_counter()
+    with multiprocessing.Pool(1) as pool:
+        try:
+            result.update(pool.apply_async(
+                run, (structure, words, engine)
+            ).get(timeout))
+            result["timeout"] = False
+        except multiprocessing.TimeoutError:
+            result["timeout"] = True
+    result["time"] = time.perf_counter() - start
+    return result
+
+
+def print_result(result):
+    """
+    Print a summary of one result returned by `benchmark`.
+    """
+    line = (f"{result['structure']:>14} {result['words_file']:>16} "
+            f"{result['engine']:>8}: ")
+    if result["timeout"]:
+        line += f"timed out after {result['time']:.1f}s"
+    else:
+        line += (f"{'solved' if result['solved'] else 'no solution':>11}, "
+                 f"{result['nodes']:>6} nodes, "
+                 f"{result['backtracks']:>6} backtracks, "
+                 f"{result['revisions']:>7} revisions, "
+                 f"{result['time']:7.3f}s")
+    print(line, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
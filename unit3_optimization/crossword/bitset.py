@@ -0,0 +1,143 @@
+import sys
+
+from crossword import *
+from generate import CrosswordCreator
+
+
+class BitsetCreator(CrosswordCreator):
+    """
+    Crossword generator keeping every domain as a bitset over the words
+    of the variable's length in the crossword's `Dictionary`.
+
+    Revising an arc only needs the letters still possible at the overlap:
+    for each letter, one AND to see if the other variable's domain still
+    has a word with that letter there, and one OR to collect the words
+    allowed in this variable's domain.
+    """
+
+    def __init__(self, crossword):
+        self.crossword = crossword
+        self.index = crossword.dictionary
+        self.domains = {
+            var: self.index.full(var.length)
+            for var in self.crossword.variables
+        }
+        self.trail = []
+
+        # Letter counts come from popcounts of the domains instead
+        self.histograms = None
+
+        self.reset_stats()
+
+    def domain_size(self, var):
+        """
+        Return the number of values left in the domain of `var`.
+        """
+        return self.domains[var].bit_count()
+
+    def enforce_node_consistency(self):
+        """
+        Update `self.domains` such that each variable is node-consistent.
+        Domains only ever hold words of the variable's length, so this
+        only has to drop bits past the end of that length's word list.
+        """
+        for var in self.domains:
+            self.domains[var] &= self.index.full(var.length)
+
+    def revise(self, x, y):
+        """
+        Make variable `x` arc consistent with variable `y`.
+        To do so, remove values from `self.domains[x]` for which there is no
+        possible corresponding value for `y` in `self.domains[y]`.
+
+        Return True if a revision was made to the domain of `x`; return
+        False if no revision was made.
+        """
+        overlap = self.crossword.overlaps[x, y]
+        if not overlap:
+            return False
+        ix, iy = overlap
+
+        # Words of x with a letter at the overlap that y can still match
+        x_masks = self.index.letters(x.length, ix)
+        y_domain = self.domains[y]
+        allowed = 0
+        for letter, mask in self.index.letters(y.length, iy).items():
+            if y_domain & mask:
+                allowed |= x_masks.get(letter, 0)
+
+        removed = self.domains[x] & ~allowed
+        if not removed:
+            return False
+        self.domains[x] ^= removed
+        self.trail.append((x, removed))
+        return True
+
+    def assign(self, var, value):
+        """
+        Reduce the domain of `var` to just `value`, recording the values
+        removed on the trail.
+        """
+        bit = 1 << self.index.ids[var.length][value]
+        self.trail.append((var, self.domains[var] & ~bit))
+        self.domains[var] = bit
+
+    def order_domain_values(self, var, assignment):
+        """
+        Return a list of values in the domain of `var`, in order by
+        the number of values they rule out for neighboring variables.
+        """
+        words = self.index.decode(var.length, self.domains[var])
+        return sorted(words, key=self.ruled_out(var, assignment))
+
+    def ruled_out(self, var, assignment):
+        """
+        Return a function giving, for a word assigned to `var`, the number
+        of values it rules out for the unassigned neighbors of `var`.
+        """
+        # Words left in each unassigned neighbor, by letter at the overlap
+        neighbors = []
+        for neighbor in self.crossword.neighbors(var):
+            if neighbor not in assignment:
+                i, j = self.crossword.overlaps[var, neighbor]
+                domain = self.domains[neighbor]
+                letters = {
+                    letter: (domain & mask).bit_count()
+                    for letter, mask in self.index.letters(
+                        neighbor.length, j
+                    ).items()
+                }
+                neighbors.append((i, letters, domain.bit_count()))
+
+        return lambda word: sum(
+            size - letters.get(word[i], 0) for i, letters, size in neighbors
+        )
+
+
+def main():
+
+    # Check usage
+    if len(sys.argv) not in [3, 4]:
+        sys.exit("Usage: python bitset.py structure words [output]")
+
+    # Parse command-line arguments
+    structure = sys.argv[1]
+    words = sys.argv[2]
+    output = sys.argv[3] if len(sys.argv) == 4 else None
+
+    # Generate crossword
+    crossword = Crossword(structure, words)
+    creator = BitsetCreator(crossword)
+    assignment = creator.solve()
+
+    # Print result
+    if assignment is None:
+        print("No solution.")
+    else:
+        creator.print(assignment)
+        if output:
+            creator.save(assignment, output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,21 @@
+from dictionary import Dictionary
+
+
 class Variable():
 
     ACROSS = "across"
     DOWN = "down"
 
-    def __init__(self, i, j, direction, length):
+    __slots__ = ("i", "j", "direction", "length", "cells", "id", "_hash")
+
+    def __init__(self, i, j, direction, length, id=None):
         """Create a new variable with starting point, direction, and length."""
         self.i = i
         self.j = j
         self.direction = direction
         self.length = length
+        self.id = id
+        self._hash = hash((i, j, direction, length))
         self.cells = []
         for k in range(self.length):
             self.cells.append(
@@ -17,7 +24,7 @@ class Variable():
             )
 
     def __hash__(self):
-        return hash((self.i, self.j, self.direction, self.length))
+        return self._hash
 
     def __eq__(self, other):
         return (
@@ -57,12 +64,12 @@ class Crossword():
                         row.append(False)
                 self.structure.append(row)
 
-        # Save vocabulary list
-        with open(words_file) as f:
-            self.words = set(f.read().upper().splitlines())
+        # Save vocabulary list, indexed by length and letter
+        self.dictionary = Dictionary.load(words_file)
+        self.words = set(self.dictionary)
 
-        # Determine variable set
-        self.variables = set()
+        # Determine variable set, numbering variables in the order found
+        variables = []
         for i in range(self.height):
             for j in range(self.width):
 
@@ -79,10 +86,11 @@ class Crossword():
                         else:
                             break
                     if length > 1:
-                        self.variables.add(Variable(
+                        variables.append(Variable(
                             i=i, j=j,
                             direction=Variable.DOWN,
-                            length=length
+                            length=length,
+                            id=len(variables)
                         ))
 
                 # Horizontal words
@@ -98,36 +106,51 @@ class Crossword():
                         else:
                             break
                     if length > 1:
-                        self.variables.add(Variable(
+                        variables.append(Variable(
                             i=i, j=j,
                             direction=Variable.ACROSS,
-                            length=length
+                            length=length,
+                            id=len(variables)
                         ))
 
+        self.variables = set(variables)
+        self.ordered = variables
+
+        # Variables crossing each cell, with the position of the cell
+        crossing = dict()
+        for var in variables:
+            for k, cell in enumerate(var.cells):
+                crossing.setdefault(cell, []).append((var, k))
+
         # Compute overlaps for each word
         # For any pair of variables v1, v2, their overlap is either:
         #    None, if the two variables do not overlap; or
         #    (i, j), where v1's ith character overlaps v2's jth character
         self.overlaps = dict()
-        for v1 in self.variables:
-            for v2 in self.variables:
-                if v1 == v2:
-                    continue
-                cells1 = v1.cells
-                cells2 = v2.cells
-                intersection = set(cells1).intersection(cells2)
-                if not intersection:
+        for v1 in variables:
+            for v2 in variables:
+                if v1 != v2:
                     self.overlaps[v1, v2] = None
-                else:
-                    intersection = intersection.pop()
-                    self.overlaps[v1, v2] = (
-                        cells1.index(intersection),
-                        cells2.index(intersection)
-                    )
+
+        adjacency = {var: set() for var in variables}
+        for cell in crossing.values():
+            for v1, k1 in cell:
+                for v2, k2 in cell:
+                    if v1 != v2:
+                        self.overlaps[v1, v2] = (k1, k2)
+                        adjacency[v1].add(v2)
+
+        # Overlapping variables of every variable, and every arc between
+        # overlapping variables, computed once
+        self.adjacency = {
+            var: frozenset(neighbors) for var, neighbors in adjacency.items()
+        }
+        self.arcs = [
+            (v1, v2)
+            for v1 in variables
+            for v2 in sorted(adjacency[v1], key=lambda var: var.id)
+        ]
 
     def neighbors(self, var):
         """Given a variable, return set of overlapping variables."""
-        return set(
-            v for v in self.variables
-            if v != var and self.overlaps[v, var]
-        )
+        return self.adjacency[var]
@@ -0,0 +1,243 @@
+import json
+import os
+import sys
+
+# Index files are saved next to the word file, with this suffix
+CACHE_SUFFIX = ".index"
+
+# Bumped whenever the layout of an index file changes
+CACHE_VERSION = 2
+
+# Character matching any letter in a pattern
+WILDCARD = "?"
+
+
+def to_bitset(indices):
+    """
+    Return the bitset with bit k set for every k in `indices`.
+    """
+    indices = list(indices)
+    if not indices:
+        return 0
+    data = bytearray(max(indices) // 8 + 1)
+    for k in indices:
+        data[k >> 3] |= 1 << (k & 7)
+    return int.from_bytes(data, "little")
+
+
+def bits(bitset):
+    """
+    Return the indices of the bits set in `bitset`, in increasing order.
+    """
+    string = bin(bitset)[:1:-1]
+    indices = []
+    k = string.find("1")
+    while k >= 0:
+        indices.append(k)
+        k = string.find("1", k + 1)
+    return indices
+
+
+def main():
+
+    # Check usage
+    if len(sys.argv) < 2:
+        sys.exit("Usage: python dictionary.py words [pattern ...]")
+
+    dictionary = Dictionary.load(sys.argv[1])
+    patterns = sys.argv[2:]
+
+    # Answer patterns from the command line, or else one per input line
+    if patterns:
+        for pattern in patterns:
+            pattern = pattern.upper()
+            print(" ".join(dictionary.match(pattern)))
+    else:
+        for line in sys.stdin:
+            pattern = line.strip().upper()
+            if pattern:
+                print(" ".join(dictionary.match(pattern)))
+
+
+class Dictionary():
+    """
+    Vocabulary indexed by length and by letter at each position.
+
+    Words of each length are numbered in alphabetical order, so that a
+    set of words of one length is a bitset: an int with bit k set if the
+    kth word of that length is in the set. `masks[length][i][letter]` is
+    the bitset of words of `length` with `letter` at position i, which
+    is all it takes to answer patterns like "C?T??".
+    """
+
+    def __init__(self, words):
+
+        # Number words of each length in alphabetical order
+        self.words = dict()
+        for word in sorted(set(words)):
+            if word:
+                self.words.setdefault(len(word), []).append(word)
+
+        self.masks = dict()
+        for length, words in self.words.items():
+
+            # Collect word numbers per position and letter, then pack
+            # each list once instead of growing a bitset word by word
+            positions = [dict() for _ in range(length)]
+            for k, word in enumerate(words):
+                for i, letter in enumerate(word):
+                    positions[i].setdefault(letter, []).append(k)
+            self.masks[length] = [
+                {letter: to_bitset(ks) for letter, ks in position.items()}
+                for position in positions
+            ]
+
+        self.index()
+
+    def index(self):
+        """
+        Number the words of every length, and reset decoded postings.
+        """
+        self.ids = {
+            length: {word: k for k, word in enumerate(words)}
+            for length, words in self.words.items()
+        }
+        self._postings = dict()
+
+    @classmethod
+    def load(cls, words_file, cache=True):
+        """
+        Return the dictionary of the words in `words_file`, one per line.
+
+        If `cache` is True, the index is read from the index file saved
+        next to `words_file` when that is up to date, and saved there
+        otherwise. Index files are JSON, with bitsets as hexadecimal
+        strings, so reading one never runs code from it.
+        """
+        path = words_file + CACHE_SUFFIX
+        stamp = [CACHE_VERSION, os.path.getsize(words_file),
+                 os.path.getmtime(words_file)]
+
+        if cache:
+            try:
+                with open(path) as f:
+                    saved = json.load(f)
+                if saved["stamp"] == stamp:
+                    dictionary = cls.__new__(cls)
+                    dictionary.words = {
+                        int(length): words
+                        for length, words in saved["words"].items()
+                    }
+                    dictionary.masks = {
+                        int(length): [
+                            {letter: int(mask, 16)
+                             for letter, mask in position.items()}
+                            for position in positions
+                        ]
+                        for length, positions in saved["masks"].items()
+                    }
+                    dictionary.index()
+                    return dictionary
+            except (OSError, ValueError, KeyError, TypeError,
+                    AttributeError):
+                pass
+
+        with open(words_file) as f:
+            dictionary = cls(f.read().upper().splitlines())
+
+        if cache:
+            saved = {
+                "stamp": stamp,
+                "words": dictionary.words,
+                "masks": {
+                    length: [
+                        {letter: format(mask, "x")
+                         for letter, mask in position.items()}
+                        for position in positions
+                    ]
+                    for length, positions in dictionary.masks.items()
+                }
+            }
+            try:
+                with open(path, "w") as f:
+                    json.dump(saved, f)
+            except OSError:
+                pass
+        return dictionary
+
+    def __iter__(self):
+        for words in self.words.values():
+            yield from words
+
+    def __len__(self):
+        return sum(len(words) for words in self.words.values())
+
+    def letters(self, length, i):
+        """
+        Return the bitsets of words of `length` by their letter at
+        position i, as a dictionary of letter to bitset.
+        """
+        if length not in self.masks:
+            return dict()
+        return self.masks[length][i]
+
+    def full(self, length):
+        """
+        Return the bitset of all words of `length`.
+        """
+        return (1 << len(self.words.get(length, []))) - 1
+
+    def decode(self, length, bitset):
+        """
+        Return the words of `length` in `bitset`, as a list.
+        """
+        words = self.words.get(length, [])
+        return [words[k] for k in bits(bitset)]
+
+    def of_length(self, length):
+        """
+        Return the words of `length`, as a list in alphabetical order.
+        """
+        return self.words.get(length, [])
+
+    def postings(self, length, i, letter):
+        """
+        Return the set of words of `length` with `letter` at position i.
+        """
+        key = (length, i, letter)
+        if key not in self._postings:
+            self._postings[key] = frozenset(self.decode(
+                length, self.letters(length, i).get(letter, 0)
+            ))
+        return self._postings[key]
+
+    def pattern(self, pattern):
+        """
+        Return the bitset of words matching `pattern`, a string with a
+        letter or `WILDCARD` at every position.
+        """
+        length = len(pattern)
+        bitset = self.full(length)
+        for i, letter in enumerate(pattern):
+            if letter != WILDCARD:
+                bitset &= self.letters(length, i).get(letter, 0)
+                if not bitset:
+                    break
+        return bitset
+
+    def match(self, pattern):
+        """
+        Return the words matching `pattern`, such as "C?T??", in
+        alphabetical order.
+        """
+        return self.decode(len(pattern), self.pattern(pattern))
+
+    def count(self, pattern):
+        """
+        Return the number of words matching `pattern`.
+        """
+        return self.pattern(pattern).bit_count()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,17 @@
 import sys
-import itertools
+import time
+
+from collections import Counter, deque
 
 from crossword import *
 
 
 class CrosswordCreator:
+
+    # Whether to record the total size of all domains at every node, which
+    # costs a pass over every variable per node
+    record_domains = False
+
     def __init__(self, crossword):
         """
         Create new CSP crossword generate.
@@ -14,6 +21,43 @@ class CrosswordCreator:
             var: self.crossword.words.copy() for var in self.crossword.variables
         }
 
+        # Values removed from domains during search, as (variable, values)
+        self.trail = []
+
+        # Letter counts of every domain at the positions neighbors read,
+        # built once domains are node consistent
+        self.histograms = None
+
+        self.reset_stats()
+
+    def reset_stats(self):
+        """
+        Reset the counts of work done by the solver: search nodes,
+        backtracks, calls to `revise`, arcs pushed on the AC-3 queue,
+        the total size of all domains at every node if `record_domains`
+        is set, and the time spent in every phase of `solve`.
+        """
+        self.stats = {
+            "nodes": 0,
+            "backtracks": 0,
+            "revisions": 0,
+            "pushes": 0,
+            "domains": [],
+            "times": {}
+        }
+
+    def timed(self, phase, function, *args):
+        """
+        Call `function` with `args`, adding the time it takes to the
+        time of `phase` in `self.stats`, and return its result.
+        """
+        start = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            times = self.stats["times"]
+            times[phase] = times.get(phase, 0) + time.perf_counter() - start
+
     def letter_grid(self, assignment):
         """
         Return 2D array representing a given assignment.
@@ -93,9 +137,12 @@ class CrosswordCreator:
         """
         Enforce node and arc consistency, and then solve the CSP.
         """
-        self.enforce_node_consistency()
-        self.ac3()
-        return self.backtrack(dict())
+        self.timed("enforce_node_consistency", self.enforce_node_consistency)
+        self.timed("ac3", self.ac3)
+
+        # Removals before search never need to be undone
+        self.trail.clear()
+        return self.timed("backtrack", self.backtrack, dict())
 
     def enforce_node_consistency(self):
         """
@@ -108,18 +155,43 @@ class CrosswordCreator:
 
         # loop over domains
         for var, words in self.domains.items():
-            # init value set
-            values = set()
-
             # only add word length == variable length into values
-            for word in words:
-                if len(word) == var.length:
-                    values.add(word)
+            values = words.intersection(
+                self.crossword.dictionary.of_length(var.length)
+            )
 
             # update new_domains
             new_domains[var] = values
         # copy new domains over
         self.domains = new_domains.copy()
+        self.histograms = self.count_letters()
+
+    def count_letters(self):
+        """
+        Return, for every variable, the number of words in its domain with
+        each letter at each position where a neighbor overlaps it, as a
+        dictionary of position to `Counter`.
+        """
+        histograms = {}
+        for var, words in self.domains.items():
+            positions = {
+                self.crossword.overlaps[var, neighbor][0]
+                for neighbor in self.crossword.neighbors(var)
+            }
+            histograms[var] = {
+                k: Counter(word[k] for word in words if len(word) > k)
+                for k in positions
+            }
+        return histograms
+
+    def letters(self, var, k):
+        """
+        Return the number of words in the domain of `var` with each letter
+        at position k, as a `Counter`.
+        """
+        if self.histograms is None:
+            self.histograms = self.count_letters()
+        return self.histograms[var][k]
 
     def revise(self, x, y):
         """
@@ -141,18 +213,23 @@ class CrosswordCreator:
             # init empty set as new x domain
             remove_words = set()
 
+            # words of y by their letter at the overlap
             ix, iy = overlap
-            for wordx in self.domains[x]:
-                results = [wordx[ix] == wordy[iy] for wordy in self.domains[y]]
-
-                # no overlap: add word for removal, update revised
-                if not any(results):
-                    remove_words.add(wordx)
-                    revised = True
+            letters = self.letters(y, iy)
+            for letter, count in self.letters(x, ix).items():
+
+                # no overlap: add words with that letter for removal
+                if count and not letters[letter]:
+                    remove_words |= self.domains[x].intersection(
+                        self.crossword.dictionary.postings(
+                            x.length, ix, letter
+                        )
+                    )
 
-            # remove words
-            for word in remove_words:
-                self.domains[x].remove(word)
+            # remove words, recording them to undo on backtrack
+            if remove_words:
+                self.remove(x, remove_words)
+                revised = True
 
         return revised
 
@@ -165,22 +242,31 @@ class CrosswordCreator:
         Return True if arc consistency is enforced and no domains are empty;
         return False if one or more domains end up empty.
         """
-        # if arcs is None: use permutations of 2 variables from all possible
+        # if arcs is None: use every pair of overlapping variables
         if arcs == None:
-            arcs = list(itertools.permutations(self.crossword.variables, 2))
+            arcs = self.crossword.arcs
 
-        while arcs:
-            x, y = arcs.pop(0)
+        # queue of arcs, each in it at most once
+        queue = deque(dict.fromkeys(arcs))
+        queued = set(queue)
+        self.stats["pushes"] += len(queue)
 
+        while queue:
+            arc = queue.popleft()
+            queued.remove(arc)
+            x, y = arc
+
+            self.stats["revisions"] += 1
             if self.revise(x, y):
                 # revised, if x domain is empty, i.e. no solution for x
-                if not len(self.domains[x]):
+                if not self.domains[x]:
                     return False
 
-                varz = self.crossword.neighbors(x) - {y}
-
-                for var in varz:
-                    arcs.append((var, x))
+                for var in self.crossword.neighbors(x):
+                    if var != y and (var, x) not in queued:
+                        queue.append((var, x))
+                        queued.add((var, x))
+                        self.stats["pushes"] += 1
         return True
 
     def assignment_complete(self, assignment):
@@ -228,6 +314,15 @@ class CrosswordCreator:
         The first value in the list, for example, should be the one
         that rules out the fewest values among the neighbors of `var`.
         """
+        # unassigned neighbors, with the overlap and their domain size
+        neighbors = []
+        for neighbor in self.crossword.neighbors(var):
+            if neighbor not in assignment:
+                i, j = self.crossword.overlaps[var, neighbor]
+                neighbors.append(
+                    (i, self.letters(neighbor, j), self.domain_size(neighbor))
+                )
+
         # unordered
         unordered_domain_values = []
 
@@ -235,21 +330,72 @@ class CrosswordCreator:
         for x in self.domains[var]:
             # init number of ruled out count
             num_out = 0
-            # if x is assigned to already: pass
-            if x in assignment:
-                pass
-
-            for neighbor in self.crossword.neighbors(var):
-                # number of rule out counter + 1 if the choosen x is also be one of the neighbor's domain
-                if x in self.domains[neighbor]:
-                    num_out += 1
+
+            for i, letters, size in neighbors:
+                # neighbor values without the same letter at the overlap
+                num_out += size - letters[x[i]]
             # append dictionary
             unordered_domain_values.append((num_out, x))
 
-        # sort in ascending order
-        ordered_domain_values = sorted(unordered_domain_values, key=lambda i: i[0])
+        # sort in ascending order, alphabetically among ties
+        ordered_domain_values = sorted(unordered_domain_values)
         return [i[1] for i in ordered_domain_values]
 
+    def assign(self, var, value):
+        """
+        Reduce the domain of `var` to just `value`, recording the values
+        removed on the trail.
+        """
+        self.remove(var, self.domains[var] - {value})
+
+    def remove(self, var, values):
+        """
+        Remove `values` from the domain of `var`, updating its letter
+        counts and recording the values on the trail.
+        """
+        self.domains[var] -= values
+        self.update_letters(var, values, -1)
+        self.trail.append((var, values))
+
+    def undo(self, mark):
+        """
+        Put back every value removed from a domain since the trail had
+        length `mark`, most recent first.
+        """
+        while len(self.trail) > mark:
+            var, values = self.trail.pop()
+            self.domains[var] |= values
+            self.update_letters(var, values, 1)
+
+    def update_letters(self, var, words, sign):
+        """
+        Add (`sign` 1) or subtract (`sign` -1) `words` from the letter
+        counts of the domain of `var`.
+        """
+        if self.histograms is None:
+            return
+        for k, letters in self.histograms[var].items():
+            for word in words:
+                if len(word) > k:
+                    letters[word[k]] += sign
+
+    def count_node(self):
+        """
+        Count a search node, along with the total size of all domains
+        if `record_domains` is set.
+        """
+        self.stats["nodes"] += 1
+        if self.record_domains:
+            self.stats["domains"].append(
+                sum(self.domain_size(var) for var in self.crossword.ordered)
+            )
+
+    def domain_size(self, var):
+        """
+        Return the number of values left in the domain of `var`.
+        """
+        return len(self.domains[var])
+
     def select_unassigned_variable(self, assignment):
         """
         Return an unassigned variable not already part of `assignment`.
@@ -258,13 +404,15 @@ class CrosswordCreator:
         degree. If there is a tie, any of the tied variables are acceptable
         return values.
         """
-        # get all unassigned variables
-        unassigned_variables = self.crossword.variables - set(assignment.keys())
+        # get all unassigned variables, in a fixed order to break ties
+        unassigned_variables = [
+            var for var in self.crossword.ordered if var not in assignment
+        ]
 
         # get remaining domain size for unassigned_variables, and put them into a list
         unassigned = []
         for var in unassigned_variables:
-            unassigned.append((len(self.domains[var]), var))
+            unassigned.append((self.domain_size(var), var))
 
         # sort unordered_unassigned variables in ascending order
         unassigned.sort(key=lambda i: i[0])
@@ -290,11 +438,15 @@ class CrosswordCreator:
         """
         Using Backtracking Search, take as input a partial assignment for the
         crossword and return a complete assignment if possible to do so.
+        After each assignment, arc consistency is restored from the assigned
+        variable, and the values that removes are undone on backtrack.
 
         `assignment` is a mapping from variables (keys) to words (values).
 
         If no assignment is possible, return None.
         """
+        self.count_node()
+
         # successfully created a crossword
         if self.assignment_complete(assignment):
             return assignment
@@ -302,24 +454,38 @@ class CrosswordCreator:
         # take an unassigned variable
         unassigned = self.select_unassigned_variable(assignment)
 
+        # words already used elsewhere in the puzzle
+        used = set(assignment.values())
+
         # backtracking
         for value in self.order_domain_values(unassigned, assignment):
+            # every value left is arc consistent with the assigned
+            # neighbors, so only distinctness needs checking
+            if value in used:
+                continue
+
             # add unassiged variable-value in assignment
             assignment[unassigned] = value
-            # check assignment is still consistent
-            if self.consistent(assignment):
-                # # generate arcs, i.e. variable pairs
-                # arcs = list(itertools.permutations(assignment.keys(), 2))
-
-                # # arc consistent
-                # if self.ac3(arcs):
-
+            mark = len(self.trail)
+            self.assign(unassigned, value)
+
+            # maintain arc consistency from the newly assigned variable
+            arcs = [
+                (var, unassigned)
+                for var in self.crossword.neighbors(unassigned)
+                if var not in assignment
+            ]
+            if self.ac3(arcs):
                 result = self.backtrack(assignment)
                 # get an answer from backtrack: return it
                 if result != None:
                     return result
-            # new added value is not ac, or no solution from backtrack
+
+            # new added value is not ac, or no solution from backtrack:
+            # put back the values removed since it was assigned
+            self.undo(mark)
             del assignment[unassigned]
+            self.stats["backtracks"] += 1
 
         return None
 
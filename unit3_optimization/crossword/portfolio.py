@@ -0,0 +1,332 @@
+import multiprocessing
+import os
+import random
+import sys
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from crossword import *
+from bitset import BitsetCreator
+
+# Failures allowed before the first restart, scaled by the Luby sequence
+RESTART_BASE = 100
+
+# Arc revisions between checks for a finished portfolio; search nodes
+# check at every node
+CHECK_EVERY = 64
+
+# Event set once some solver in the portfolio has finished, set by
+# `_init_worker` in each worker process
+_stop = None
+
+
+class Restart(Exception):
+    """Raised to abandon a search that has failed too many times."""
+
+
+class Cancelled(Exception):
+    """Raised to abandon a search once another solver has finished."""
+
+
+def luby(i):
+    """
+    Return the ith term of the Luby sequence 1, 1, 2, 1, 1, 2, 4, 1, ...
+    """
+    k = 1
+    while (1 << k) - 1 < i:
+        k += 1
+    while i != (1 << k) - 1:
+        i -= (1 << (k - 1)) - 1
+        k = 1
+        while (1 << k) - 1 < i:
+            k += 1
+    return 1 << (k - 1)
+
+
+class RandomizedCreator(BitsetCreator):
+    """
+    Bitset crossword generator with random tie-breaking and restarts.
+
+    With a `seed`, ties between variables and between values are broken
+    at random, and `values` "random" shuffles values instead of ordering
+    them by the values they rule out. With `restart`, the search starts
+    over after that many failures times the next term of the Luby
+    sequence. Before starting over, every value refuted at a decision on
+    the current path is recorded as a nogood: that value together with
+    the decisions above it can never be part of a solution, so later
+    runs skip it.
+    """
+
+    def __init__(self, crossword, seed=None, values="lcv", restart=None,
+                 stop=None):
+        super().__init__(crossword)
+        self.rng = None if seed is None else random.Random(seed)
+        self.values = values
+        self.restart = restart
+        self.stop = stop
+
+        # Nogoods by each (variable, value) in them, and nogoods of just
+        # one (variable, value), pruned from the domains at every restart
+        self.nogoods = dict()
+        self.pruned = []
+
+        self.fails = 0
+        self.limit = None
+        self.runs = 0
+
+    def solve(self):
+        """
+        Enforce node and arc consistency, and then solve the CSP,
+        restarting whenever a run reaches its limit of failures.
+        """
+        self.timed("enforce_node_consistency", self.enforce_node_consistency)
+        self.timed("ac3", self.ac3)
+        self.trail.clear()
+
+        while True:
+            self.runs += 1
+            self.fails = 0
+            if self.restart is not None:
+                self.limit = self.restart * luby(self.runs)
+            try:
+                return self.timed("backtrack", self.backtrack, dict())
+            except Restart:
+                self.undo(0)
+
+            # Values refuted without any decision are gone for good
+            for var, value in self.pruned:
+                self.domains[var] &= ~(1 << self.index.ids[var.length][value])
+            self.pruned.clear()
+            if not all(self.domains.values()):
+                return None
+            if not self.timed("ac3", self.ac3):
+                return None
+            self.trail.clear()
+
+    def check_stop(self):
+        """
+        Raise `Cancelled` if another solver in the portfolio has finished.
+        """
+        if self.stop is not None and self.stop.is_set():
+            raise Cancelled
+
+    def revise(self, x, y):
+        """
+        Revise like `BitsetCreator.revise`, checking every `CHECK_EVERY`
+        revisions whether the search has been cancelled, so that a long
+        run of arc consistency does not hold up the portfolio.
+        """
+        if self.stats["revisions"] % CHECK_EVERY == 0:
+            self.check_stop()
+        return super().revise(x, y)
+
+    def select_unassigned_variable(self, assignment):
+        """
+        Return the unassigned variable with the fewest values left, then
+        the most neighbors, breaking remaining ties at random.
+        """
+        if self.rng is None:
+            return super().select_unassigned_variable(assignment)
+        return min(
+            (var for var in self.crossword.ordered if var not in assignment),
+            key=lambda var: (
+                self.domain_size(var),
+                -len(self.crossword.neighbors(var)),
+                self.rng.random()
+            )
+        )
+
+    def order_domain_values(self, var, assignment):
+        """
+        Return a list of values in the domain of `var`, shuffled, and
+        then ordered by the values they rule out unless `values` is
+        "random".
+        """
+        if self.rng is None:
+            return super().order_domain_values(var, assignment)
+        words = self.index.decode(var.length, self.domains[var])
+        self.rng.shuffle(words)
+        if self.values != "random":
+            words.sort(key=self.ruled_out(var, assignment))
+        return words
+
+    def add_nogood(self, nogood):
+        """
+        Record `nogood`, a frozenset of (variable, value) pairs that
+        cannot all hold in a solution.
+        """
+        if len(nogood) == 1:
+            self.pruned.extend(nogood)
+        for literal in nogood:
+            self.nogoods.setdefault(literal, set()).add(nogood)
+
+    def excluded(self, var, value, assignment):
+        """
+        Return True if assigning `value` to `var` would complete a nogood
+        with `assignment`.
+        """
+        for nogood in self.nogoods.get((var, value), ()):
+            if all(
+                v == var or assignment.get(v) == word for v, word in nogood
+            ):
+                return True
+        return False
+
+    def backtrack(self, assignment):
+        """
+        Search like `CrosswordCreator.backtrack`, skipping values excluded
+        by nogoods, and raise `Restart` once the run has failed more times
+        than its limit, recording the values refuted along the way.
+        """
+        self.count_node()
+        self.check_stop()
+
+        if self.assignment_complete(assignment):
+            return assignment
+
+        var = self.select_unassigned_variable(assignment)
+        used = set(assignment.values())
+        decisions = frozenset(assignment.items())
+        refuted = []
+
+        for value in self.order_domain_values(var, assignment):
+            if value in used or self.excluded(var, value, assignment):
+                continue
+
+            assignment[var] = value
+            mark = len(self.trail)
+            self.assign(var, value)
+            arcs = [
+                (neighbor, var)
+                for neighbor in self.crossword.neighbors(var)
+                if neighbor not in assignment
+            ]
+            try:
+                if self.ac3(arcs):
+                    result = self.backtrack(assignment)
+                    if result is not None:
+                        return result
+            except Restart:
+                self.undo(mark)
+                del assignment[var]
+                for v in refuted:
+                    self.add_nogood(decisions | {(var, v)})
+                raise
+
+            self.undo(mark)
+            del assignment[var]
+            self.stats["backtracks"] += 1
+            refuted.append(value)
+
+            self.fails += 1
+            if self.limit is not None and self.fails > self.limit:
+                for v in refuted:
+                    self.add_nogood(decisions | {(var, v)})
+                raise Restart
+
+        return None
+
+
+def configurations(n, seed=0):
+    """
+    Return `n` solver configurations for a portfolio: the deterministic
+    solver, then randomized solvers with restarts, alternating between
+    ordering values by the values they rule out and at random.
+    """
+    configs = [dict(seed=None, values="lcv", restart=None)]
+    for k in range(1, n):
+        configs.append(dict(
+            seed=seed + k,
+            values="lcv" if k % 2 else "random",
+            restart=RESTART_BASE
+        ))
+    return configs[:n]
+
+
+def _init_worker(stop):
+    """
+    Make the portfolio's stop event available to `_solve` in a worker
+    process.
+    """
+    global _stop
+    _stop = stop
+
+
+def _solve(structure_file, words_file, config):
+    """
+    Solve a crossword with one solver configuration, and return the
+    assignment, or None if there is none, along with whether the search
+    finished instead of being cancelled.
+    """
+    crossword = Crossword(structure_file, words_file)
+    creator = RandomizedCreator(crossword, stop=_stop, **config)
+    try:
+        return creator.solve(), True
+    except Cancelled:
+        return None, False
+
+
+def portfolio(structure_file, words_file, processes=None, configs=None,
+              seed=0):
+    """
+    Solve a crossword with every configuration in `configs` at once,
+    across `processes` processes, and return the result of the first
+    solver to finish, along with its configuration. The other solvers
+    are cancelled, which they notice within `CHECK_EVERY` revisions.
+    """
+    processes = processes or os.cpu_count()
+    configs = configs or configurations(processes, seed)
+
+    # Build the word index once so that every worker loads it from disk
+    Crossword(structure_file, words_file)
+
+    stop = multiprocessing.Event()
+    executor = ProcessPoolExecutor(
+        max_workers=processes, initializer=_init_worker, initargs=(stop,)
+    )
+    futures = {
+        executor.submit(_solve, structure_file, words_file, config): config
+        for config in configs
+    }
+    try:
+        for future in as_completed(futures):
+            assignment, finished = future.result()
+            if finished:
+                return assignment, futures[future]
+    finally:
+        stop.set()
+        # Leaving running workers behind races the executor's exit
+        # handler, so wait for them, which only takes them a moment now
+        executor.shutdown(wait=True, cancel_futures=True)
+    return None, None
+
+
+def main():
+
+    # Check usage
+    if len(sys.argv) not in [3, 4, 5]:
+        sys.exit("Usage: python portfolio.py structure words "
+                 "[output] [processes]")
+
+    # Parse command-line arguments
+    structure = sys.argv[1]
+    words = sys.argv[2]
+    output = sys.argv[3] if len(sys.argv) > 3 else None
+    processes = int(sys.argv[4]) if len(sys.argv) > 4 else None
+
+    # Generate crossword
+    assignment, config = portfolio(structure, words, processes)
+    creator = BitsetCreator(Crossword(structure, words))
+
+    # Print result
+    if assignment is None:
+        print("No solution.")
+    else:
+        print(f"Solved by {config}")
+        creator.print(assignment)
+        if output:
+            creator.save(assignment, output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,48 @@
+import math
 import random
 
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+# Distance standing in for a missing second-nearest hospital
+UNREACHABLE = 1 << 30
+
+# Simulated annealing: default geometric temperature schedule and steps
+START_TEMPERATURE = 10.0
+COOLING = 0.995
+ANNEALING_STEPS = 2000
+
+# Tabu search: iterations a vacated cell stays tabu, and default steps
+TABU_TENURE = 10
+TABU_STEPS = 200
+
+
+def geometric_schedule(start=START_TEMPERATURE, cooling=COOLING):
+    """
+    Return a temperature schedule starting at `start` and multiplied by
+    `cooling` every step. Schedules are picklable, so they can be passed
+    to `Space.multi_start`.
+    """
+    return partial(_geometric, start, cooling)
+
+
+def linear_schedule(start=START_TEMPERATURE, steps=ANNEALING_STEPS):
+    """
+    Return a temperature schedule falling from `start` to 0 in `steps`
+    steps.
+    """
+    return partial(_linear, start, steps)
+
+
+def _geometric(start, cooling, t):
+    return start * cooling ** t
+
+
+def _linear(start, steps, t):
+    return start * max(0, 1 - t / steps)
+
 
 class Space():
 
@@ -11,6 +54,11 @@ class Space():
         self.houses = set()
         self.hospitals = set()
 
+        # Cost after every iteration of the last search, and of every
+        # search of the last multi-start run
+        self.trace = []
+        self.traces = []
+
     def add_house(self, row, col):
         """Add a house at a particular location in state space."""
         self.houses.add((row, col))
@@ -37,61 +85,212 @@ class Space():
         count = 0
 
         # Start by initializing hospitals randomly
-        self.hospitals = set()
-        for i in range(self.num_hospitals):
-            self.hospitals.add(random.choice(list(self.available_spaces())))
+        evaluator = self.random_state()
+        self.trace = [evaluator.cost]
         if log:
-            print("Initial state: cost", self.get_cost(self.hospitals))
+            print("Initial state: cost", evaluator.cost)
         if image_prefix:
             self.output_image(f"{image_prefix}{str(count).zfill(3)}.png")
 
         # Continue until we reach maximum number of iterations
         while maximum is None or count < maximum:
             count += 1
-            best_neighbors = []
-            best_neighbor_cost = None
-
-            # Consider all hospitals to move
-            for hospital in self.hospitals:
-
-                # Consider all neighbors for that hospital
-                for replacement in self.get_neighbors(*hospital):
-
-                    # Generate a neighboring set of hospitals
-                    neighbor = self.hospitals.copy()
-                    neighbor.remove(hospital)
-                    neighbor.add(replacement)
 
-                    # Check if neighbor is best so far
-                    cost = self.get_cost(neighbor)
-                    if best_neighbor_cost is None or cost < best_neighbor_cost:
-                        best_neighbor_cost = cost
-                        best_neighbors = [neighbor]
-                    elif best_neighbor_cost == cost:
-                        best_neighbors.append(neighbor)
+            # Consider all neighbors of all hospitals, costed at once
+            moves = [
+                (k, replacement)
+                for k, hospital in enumerate(evaluator.hospitals)
+                for replacement in self.get_neighbors(*hospital)
+            ]
+            if not moves:
+                return self.hospitals
+            costs = evaluator.costs(moves)
+            best_neighbor_cost = costs.min()
 
             # None of the neighbors are better than the current state
-            if best_neighbor_cost >= self.get_cost(self.hospitals):
+            if best_neighbor_cost >= evaluator.cost:
                 return self.hospitals
 
             # Move to a highest-valued neighbor
             else:
                 if log:
                     print(f"Found better neighbor: cost {best_neighbor_cost}")
-                self.hospitals = random.choice(best_neighbors)
+                best_neighbors = np.flatnonzero(costs == best_neighbor_cost)
+                evaluator.move(*moves[random.choice(best_neighbors)])
+                self.hospitals = set(evaluator.hospitals)
+                self.trace.append(evaluator.cost)
 
             # Generate image
             if image_prefix:
                 self.output_image(f"{image_prefix}{str(count).zfill(3)}.png")
 
+        return self.hospitals
+
+    def simulated_annealing(self, maximum=ANNEALING_STEPS, schedule=None,
+                            image_prefix=None, log=False):
+        """
+        Performs simulated annealing to find a solution.
+
+        Every step moves a random hospital to a random neighboring cell if
+        that lowers the cost, and otherwise with probability
+        exp(-increase / temperature), where `schedule` gives the
+        temperature at every step. Returns the best state found.
+        """
+        schedule = schedule or geometric_schedule()
+
+        # Start by initializing hospitals randomly
+        evaluator = self.random_state()
+        best_cost = evaluator.cost
+        best_hospitals = self.hospitals
+        self.trace = [evaluator.cost]
+        if log:
+            print("Initial state: cost", evaluator.cost)
+
+        for count in range(1, maximum + 1):
+            temperature = schedule(count)
+            if temperature <= 0:
+                break
+
+            # Consider one random neighbor of one random hospital
+            k = random.randrange(len(evaluator.hospitals))
+            replacements = self.get_neighbors(*evaluator.hospitals[k])
+            if replacements:
+                replacement = random.choice(replacements)
+                cost = int(evaluator.costs([(k, replacement)])[0])
+                increase = cost - evaluator.cost
+                if increase <= 0 or (
+                        random.random() < math.exp(-increase / temperature)):
+                    evaluator.move(k, replacement)
+                    self.hospitals = set(evaluator.hospitals)
+
+            self.trace.append(evaluator.cost)
+
+            # Keep the best state seen
+            if evaluator.cost < best_cost:
+                best_cost = evaluator.cost
+                best_hospitals = self.hospitals
+                if log:
+                    print(f"{count}: Found new best state: cost {best_cost}")
+                if image_prefix:
+                    self.output_image(
+                        f"{image_prefix}{str(count).zfill(3)}.png"
+                    )
+
+        self.hospitals = best_hospitals
+        return self.hospitals
+
+    def tabu_search(self, maximum=TABU_STEPS, tenure=TABU_TENURE,
+                    image_prefix=None, log=False):
+        """
+        Performs tabu search to find a solution.
+
+        Every step moves to the best neighbor, even if it is worse, except
+        that no hospital may move onto a cell vacated in the last `tenure`
+        steps unless that gives a new best state. Returns the best state
+        found.
+        """
+        # Start by initializing hospitals randomly
+        evaluator = self.random_state()
+        best_cost = evaluator.cost
+        best_hospitals = self.hospitals
+        self.trace = [evaluator.cost]
+        if log:
+            print("Initial state: cost", evaluator.cost)
+
+        # Step until which each vacated cell is tabu
+        tabu = dict()
+
+        for count in range(1, maximum + 1):
+
+            # Consider all neighbors of all hospitals, costed at once
+            moves = [
+                (k, replacement)
+                for k, hospital in enumerate(evaluator.hospitals)
+                for replacement in self.get_neighbors(*hospital)
+            ]
+            if not moves:
+                break
+            costs = evaluator.costs(moves)
+            allowed = np.array([
+                tabu.get(replacement, 0) < count for k, replacement in moves
+            ]) | (costs < best_cost)
+            if not allowed.any():
+                break
+
+            # Move to a best allowed neighbor
+            cost = costs[allowed].min()
+            candidates = np.flatnonzero(allowed & (costs == cost))
+            k, replacement = moves[random.choice(candidates)]
+            tabu[evaluator.hospitals[k]] = count + tenure
+            evaluator.move(k, replacement)
+            self.hospitals = set(evaluator.hospitals)
+            self.trace.append(evaluator.cost)
+
+            # Keep the best state seen
+            if evaluator.cost < best_cost:
+                best_cost = evaluator.cost
+                best_hospitals = self.hospitals
+                if log:
+                    print(f"{count}: Found new best state: cost {best_cost}")
+                if image_prefix:
+                    self.output_image(
+                        f"{image_prefix}{str(count).zfill(3)}.png"
+                    )
+
+        self.hospitals = best_hospitals
+        return self.hospitals
+
+    def multi_start(self, runs, method="hill_climb", processes=None,
+                    seed=None, log=False, **options):
+        """
+        Runs local search `method` from `runs` random states across
+        `processes` processes, and returns the best state found.
+        The cost traces of all runs are kept in `traces`.
+        """
+        rng = random.Random(seed)
+        tasks = [
+            (self, method, rng.getrandbits(32), options) for i in range(runs)
+        ]
+        if processes == 1:
+            results = [_search(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                results = list(executor.map(_search, tasks))
+
+        best_hospitals = None
+        best_cost = None
+        for i, (hospitals, cost, trace) in enumerate(results):
+            if best_cost is None or cost < best_cost:
+                best_cost = cost
+                best_hospitals = hospitals
+            if log:
+                print(f"{i}: Found state: cost {cost}")
+
+        self.traces = [trace for hospitals, cost, trace in results]
+        self.hospitals = best_hospitals
+        return self.hospitals
+
+    def random_state(self):
+        """
+        Places hospitals on random available cells, and returns a
+        `CostEvaluator` for them.
+        """
+        self.hospitals = set()
+        self.hospitals = set(
+            random.sample(list(self.available_spaces()), self.num_hospitals)
+        )
+        return CostEvaluator(self.houses, self.hospitals)
+
     def random_restart(self, maximum, image_prefix=None, log=False):
         """Repeats hill-climbing multiple times."""
         best_hospitals = None
         best_cost = None
+        self.traces = []
 
         # Repeat hill-climbing a fixed number of times
         for i in range(maximum):
             hospitals = self.hill_climb()
+            self.traces.append(self.trace)
             cost = self.get_cost(hospitals)
             if best_cost is None or cost < best_cost:
                 best_cost = cost
@@ -190,10 +389,121 @@ class Space():
         img.save(filename)
 
 
-# Create a new space and add houses randomly
-s = Space(height=10, width=20, num_hospitals=3)
-for i in range(15):
-    s.add_house(random.randrange(s.height), random.randrange(s.width))
+def _search(args):
+    """
+    Unpack arguments for a local search so it can be used with `map`,
+    and return the state found, its cost and the cost trace.
+    """
+    space, method, seed, options = args
+    random.seed(seed)
+    hospitals = getattr(space, method)(**options)
+    return hospitals, space.get_cost(hospitals), space.trace
+
+
+class CostEvaluator():
+    """
+    Sum of distances from houses to their nearest hospital, kept up to
+    date as hospitals move one at a time.
+
+    For every house, the distance to its nearest hospital and to the
+    second-nearest one are kept, so the cost after moving any hospital
+    only needs the distances from the houses to the new location: houses
+    that were nearest to the moved hospital fall back to their second
+    nearest.
+    """
+
+    def __init__(self, houses, hospitals):
+        self.houses = np.array(sorted(houses), dtype=np.int32).reshape(-1, 2)
+        self.hospitals = list(hospitals)
+
+        # Nearest and second-nearest hospital of every house, by index
+        # into `hospitals`, and their distances
+        n = len(self.houses)
+        self.nearest = np.zeros(n, dtype=np.int32)
+        self.runner_up = np.zeros(n, dtype=np.int32)
+        self.first = np.zeros(n, dtype=np.int32)
+        self.second = np.zeros(n, dtype=np.int32)
+        self.update(np.arange(n))
+
+    def distances(self, cell):
+        """
+        Return the distance from every house to `cell`.
+        """
+        return np.abs(self.houses - np.array(cell)).sum(axis=1)
+
+    def update(self, rows):
+        """
+        Recompute nearest and second-nearest hospitals of the houses in
+        `rows` from scratch, and the total cost.
+        """
+        positions = np.array(self.hospitals, dtype=np.int32).reshape(-1, 2)
+        distances = np.abs(
+            self.houses[rows, None, :] - positions[None, :, :]
+        ).sum(axis=2)
+
+        # Without a second hospital, its distance is effectively infinite
+        if len(self.hospitals) < 2:
+            distances = np.hstack([
+                distances,
+                np.full((len(rows), 2 - len(self.hospitals)), UNREACHABLE)
+            ])
+        order = np.argpartition(distances, 1, axis=1)[:, :2]
+        ranked = np.take_along_axis(distances, order, axis=1)
+        self.nearest[rows], self.runner_up[rows] = order.T
+        self.first[rows], self.second[rows] = ranked.T
+        self.cost = int(self.first.sum())
+
+    def costs(self, moves):
+        """
+        Return the cost after each move in `moves`, a list of (k, cell)
+        moving the kth hospital to `cell`, as an array.
+        """
+        ks = np.array([k for k, cell in moves])
+        cells = np.array([cell for k, cell in moves], dtype=np.int32)
+
+        # Distance from every house to the new location, for every move
+        new = np.abs(self.houses[None, :, 0] - cells[:, 0, None])
+        new += np.abs(self.houses[None, :, 1] - cells[:, 1, None])
+
+        # Nearest of the hospitals that stay, for every move and house
+        remaining = np.where(
+            self.nearest[None, :] == ks[:, None],
+            self.second[None, :], self.first[None, :]
+        )
+        np.minimum(remaining, new, out=new)
+        return new.sum(axis=1)
+
+    def move(self, k, cell):
+        """
+        Move the kth hospital to `cell`, in O(houses) unless many houses
+        had it as their nearest or second-nearest hospital.
+        """
+        self.hospitals[k] = cell
+        new = self.distances(cell)
+
+        # Houses that lost their nearest or second-nearest hospital
+        stale = (self.nearest == k) | (self.runner_up == k)
+
+        # Other houses only need to compare the new location
+        closer = ~stale & (new < self.first)
+        self.runner_up[closer] = self.nearest[closer]
+        self.second[closer] = self.first[closer]
+        self.nearest[closer] = k
+        self.first[closer] = new[closer]
+
+        between = ~stale & ~closer & (new < self.second)
+        self.runner_up[between] = k
+        self.second[between] = new[between]
+
+        self.update(np.flatnonzero(stale))
+
+
+if __name__ == "__main__":
+
+    # Create a new space and add houses randomly
+    s = Space(height=10, width=20, num_hospitals=3)
+    for i in range(15):
+        s.add_house(random.randrange(s.height), random.randrange(s.width))
 
-# Use local search to determine hospital placement
-hospitals = s.hill_climb(image_prefix="hospitals", log=True)
+    # Use local search to determine hospital placement
+    hospitals = s.hill_climb(image_prefix="hospitals", log=True)